@@ -1,12 +1,45 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.db.models.functions import Substr
+from django.utils.text import Truncator
 
-from .models import Category, Comment, Location, Post
+from .models import Category, Comment, Job, Location, Post
+from .paginator import EstimatedCountPaginator
+from .search import search_posts
 
+TEXT_PREVIEW_LENGTH = 100
 
-class PostAdmin(admin.ModelAdmin):
+
+class TextPreviewChangeList(ChangeList):
+    """Список объектов, который загружает только начало поля text."""
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('text').annotate(
+            text_preview=Substr('text', 1, TEXT_PREVIEW_LENGTH + 1)
+        )
+
+
+class ScalableAdminMixin:
+    """
+    Настройки списка для больших таблиц: вместо полного текста выводится
+    его начало, число строк без фильтров оценивается, а не считается.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return TextPreviewChangeList
+
+    @admin.display(description='Текст')
+    def short_text(self, obj):
+        return Truncator(obj.text_preview).chars(TEXT_PREVIEW_LENGTH)
+
+
+class PostAdmin(ScalableAdminMixin, admin.ModelAdmin):
     list_display = (
         'title',
-        'text',
+        'short_text',
         'pub_date',
         'is_published',
         'created_at',
@@ -17,8 +50,25 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = (
         'is_published',
     )
+    list_select_related = (
+        'author',
+        'location',
+        'category',
+    )
+    autocomplete_fields = (
+        'author',
+        'location',
+        'category',
+    )
+    date_hierarchy = 'pub_date'
     search_fields = ('title',)
 
+    def get_search_results(self, request, queryset, search_term):
+        """Ищет по полнотекстовому индексу вместо LIKE по заголовку."""
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
 
 class LocationAdmin(admin.ModelAdmin):
     list_display = (
@@ -39,16 +89,54 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ('title',)
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ScalableAdminMixin, admin.ModelAdmin):
     list_display = (
         'author',
         'created_at',
-        'text',
+        'short_text',
         'is_published',
     )
+    list_select_related = (
+        'author',
+    )
+    autocomplete_fields = (
+        'author',
+        'post',
+    )
+    date_hierarchy = 'created_at'
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'name',
+        'status',
+        'attempts',
+        'created_at',
+        'started_at',
+        'finished_at',
+    )
+    list_filter = (
+        'status',
+        'name',
+    )
+    readonly_fields = (
+        'name',
+        'kwargs',
+        'attempts',
+        'error',
+        'created_at',
+        'started_at',
+        'finished_at',
+    )
+    actions = ('requeue',)
+
+    @admin.action(description='Вернуть в очередь')
+    def requeue(self, request, queryset):
+        queryset.update(status=Job.PENDING, attempts=0, error='')
 
 
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(Job, JobAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Post, PostAdmin)
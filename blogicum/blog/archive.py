@@ -0,0 +1,276 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .caching import invalidate_anonymous_pages
+from .models import Category, Comment, Location, Post, User
+from .paginator import invalidate_feed_counts
+from .routers import archive_reads, get_archive
+from .search import unindex_posts
+from .transactions import serialized_write
+
+# Таблицы, на которые ссылаются посты и комментарии. Архив хранит
+# их копии, чтобы select_related и внешние ключи работали внутри архива.
+REFERENCE_MODELS = (User, Category, Location)
+
+# Из пользователей в архив попадает только то, что выводится рядом
+# с постами и комментариями. Пароли, почта и права остаются в основной
+# базе, а архивные копии не могут войти на сайт.
+ARCHIVED_USER_FIELDS = ('username', 'first_name', 'last_name', 'date_joined')
+
+
+def archive_horizon(days=None, now=None):
+    """Посты, опубликованные раньше этой даты, переносятся в архив."""
+    if days is None:
+        days = settings.ARCHIVE_HORIZON_DAYS
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def is_archived(obj):
+    archive = get_archive()
+    return archive is not None and obj._state.db == archive
+
+
+def copy_rows(model, objects, using):
+    """
+    Вставляет строки как есть, пропуская уже существующие ключи.
+    В отличие от bulk_create, не перезаписывает поля auto_now и
+    auto_now_add, поэтому даты создания и изменения сохраняются.
+    """
+    connection = connections[using]
+    ops = connection.ops
+    fields = model._meta.concrete_fields
+    rows = [
+        [field.get_db_prep_save(getattr(obj, field.attname), connection)
+         for field in fields]
+        for obj in objects
+    ]
+    if not rows:
+        return
+    columns = ', '.join(ops.quote_name(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'{ops.insert_statement(ignore_conflicts=True)} '
+            f'{ops.quote_name(model._meta.db_table)} ({columns}) '
+            f'VALUES ({placeholders}) '
+            f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}',
+            rows,
+        )
+
+
+def delete_rows(model, column, values, using):
+    """
+    Удаляет строки одним запросом без сигналов и каскада Django:
+    обработчики post_delete удалили бы изображения, которые остаются
+    у архивных постов.
+    """
+    values = list(values)
+    if not values:
+        return
+    ops = connections[using].ops
+    placeholders = ', '.join(['%s'] * len(values))
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {ops.quote_name(model._meta.db_table)} '
+            f'WHERE {ops.quote_name(column)} IN ({placeholders})',
+            values,
+        )
+
+
+def archived_user(user):
+    """Копия пользователя для архива без пароля, почты и прав."""
+    return User(
+        pk=user.pk,
+        password=make_password(None),
+        is_active=False,
+        **{field: getattr(user, field) for field in ARCHIVED_USER_FIELDS},
+    )
+
+
+def reference_rows(model, pks):
+    """Строки справочника из основной базы в том виде, как их хранит архив."""
+    queryset = model._default_manager.using('default').filter(pk__in=pks)
+    if model is User:
+        return [
+            archived_user(user)
+            for user in queryset.only('pk', *ARCHIVED_USER_FIELDS)
+        ]
+    return list(queryset)
+
+
+def copy_references(posts, comments, archive):
+    """Копирует в архив авторов, категории и локации переносимых строк."""
+    ids = {
+        User: {post.author_id for post in posts}
+        | {comment.author_id for comment in comments},
+        Category: {post.category_id for post in posts},
+        Location: {post.location_id for post in posts},
+    }
+    for model in REFERENCE_MODELS:
+        copy_rows(model, reference_rows(model, ids[model] - {None}), archive)
+
+
+def archive_batch(horizon, batch_size, archive):
+    """
+    Переносит в архив до batch_size самых старых постов, опубликованных
+    раньше horizon, вместе с комментариями. Возвращает их число.
+
+    Пачка копируется в архив и удаляется из основной базы под
+    блокировкой записи основной базы, поэтому новые комментарии
+    к переносимым постам не теряются. Если процесс прервётся между
+    фиксацией архива и основной базы, повторный запуск просто
+    пропустит уже скопированные строки.
+    """
+    @serialized_write
+    def move():
+        posts = list(
+            Post.objects.using('default').filter(
+                pub_date__lt=horizon
+            ).order_by('pub_date', 'pk')[:batch_size]
+        )
+        pks = [post.pk for post in posts]
+        comments = list(
+            Comment.objects.using('default').filter(post_id__in=pks)
+        )
+        with transaction.atomic(using=archive):
+            copy_references(posts, comments, archive)
+            copy_rows(Post, posts, archive)
+            copy_rows(Comment, comments, archive)
+        delete_rows(Comment, 'post_id', pks, 'default')
+        delete_rows(Post, 'id', pks, 'default')
+        unindex_posts(pks)
+        return pks
+
+    pks = move()
+    if pks:
+        invalidate_anonymous_pages(*(f'post:{pk}' for pk in pks))
+        invalidate_feed_counts()
+    return len(pks)
+
+
+def refresh_references(archive, batch_size):
+    """
+    Обновляет в архиве копии пользователей, категорий и локаций.
+    У пользователей при этом затираются пароли и почта, если архив
+    заполнялся ещё полными копиями.
+    Удалённые из основной базы удаляются и из архива по тем же
+    правилам, что в моделях: посты и комментарии пользователя
+    удаляются, у постов удалённой категории или локации она обнуляется.
+    """
+    for model in REFERENCE_MODELS:
+        archived = model._default_manager.using(archive)
+        fields = [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key
+        ]
+        pks = list(archived.values_list('pk', flat=True))
+        for start in range(0, len(pks), batch_size):
+            chunk = pks[start:start + batch_size]
+            current = reference_rows(model, chunk)
+            with transaction.atomic(using=archive):
+                archived.bulk_update(current, fields)
+                removed = set(chunk) - {obj.pk for obj in current}
+                if removed:
+                    remove_references(model, removed, archive)
+
+
+def remove_references(model, pks, archive):
+    posts = Post.objects.using(archive)
+    if model is User:
+        post_ids = list(
+            posts.filter(author__in=pks).values_list('pk', flat=True)
+        )
+        delete_rows(Comment, 'post_id', post_ids, archive)
+        delete_rows(Comment, 'author_id', pks, archive)
+        delete_rows(Post, 'id', post_ids, archive)
+    else:
+        field = 'category' if model is Category else 'location'
+        posts.filter(**{f'{field}__in': pks}).update(**{field: None})
+    delete_rows(model, model._meta.pk.column, pks, archive)
+
+
+class ArchivedFeed:
+    """
+    Лента постов, которая продолжается в архивной базе.
+    В архиве посты старше горизонта, поэтому при сортировке от новых
+    к старым архивная часть идёт после основной, а от старых к новым —
+    перед ней. Архив читается, только когда срез выходит за основную
+    часть, так что первые страницы ленты его не затрагивают.
+    Поддерживает то, что нужно пагинаторам: count(), срезы,
+    filter() и order_by().
+    """
+
+    ordered = True
+
+    def __init__(self, queryset, reverse=False):
+        self.queryset = queryset
+        self.reverse = reverse
+
+    @property
+    def model(self):
+        return self.queryset.model
+
+    def filter(self, *args, **kwargs):
+        return ArchivedFeed(
+            self.queryset.filter(*args, **kwargs), self.reverse
+        )
+
+    def order_by(self, *fields):
+        return ArchivedFeed(
+            self.queryset.order_by(*fields),
+            bool(fields) and not str(fields[0]).startswith('-'),
+        )
+
+    def parts(self):
+        return (True, False) if self.reverse else (False, True)
+
+    def read(self, archived, function):
+        if not archived:
+            return function(self.queryset)
+        with archive_reads():
+            return function(self.queryset)
+
+    @cached_property
+    def counts(self):
+        return [
+            self.read(archived, lambda queryset: queryset.count())
+            for archived in self.parts()
+        ]
+
+    def count(self):
+        return sum(self.counts)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        first, second = self.parts()
+        rows = self.read(
+            first, lambda queryset: list(queryset[start:stop])
+        )
+        if stop is not None and len(rows) >= stop - start:
+            return rows
+        if rows or not start:
+            first_count = start + len(rows)
+        else:
+            first_count = self.counts[0]
+        offset = max(start - first_count, 0)
+        limit = None if stop is None else stop - first_count
+        return rows + self.read(
+            second, lambda queryset: list(queryset[offset:limit])
+        )
+
+
+def with_archive(queryset):
+    """Продолжает выборку постов архивом, если он настроен."""
+    if get_archive() is None:
+        return queryset
+    return ArchivedFeed(queryset)
@@ -0,0 +1,264 @@
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import Category, Post, User
+from .paginator import invalidate_feed_counts
+
+POST_CARD_FRAGMENT = 'post_card'
+ANONYMOUS_PAGES_ALL = 'all'
+
+
+def post_card_cache():
+    return caches[settings.POST_CARD_CACHE_ALIAS]
+
+
+def post_card_cache_keys(post_id, comment_count, updated_at):
+    """
+    Ключи фрагмента карточки поста для автора и прочих зрителей.
+    В ключе есть updated_at, поэтому любое изменение поста, в том числе
+    через QuerySet.update(), само выводит старую карточку из оборота.
+    """
+    return [
+        make_template_fragment_key(
+            POST_CARD_FRAGMENT,
+            [post_id, comment_count, updated_at, viewer_is_author],
+        )
+        for viewer_is_author in (True, False)
+    ]
+
+
+def invalidate_post_cards(posts):
+    """
+    Удаляет закешированные карточки постов.
+    posts — тройки (id, comment_count, updated_at).
+    """
+    keys = []
+    for post_id, comment_count, updated_at in posts:
+        keys.extend(
+            post_card_cache_keys(post_id, comment_count, updated_at)
+        )
+    if keys:
+        post_card_cache().delete_many(keys)
+
+
+def _anonymous_scope_key(scope):
+    return f'anonymous_page_version:{scope}'
+
+
+def _version_now():
+    """Версия области — время её последнего изменения в микросекундах."""
+    return time.time_ns() // 1000
+
+
+def scope_versions(*scopes):
+    """
+    Версии областей страниц.
+    Отсутствующая в кеше версия заводится текущим временем: после
+    перезапуска или вытеснения из кеша она не повторит прежние значения.
+    """
+    keys = [_anonymous_scope_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _version_now(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def scopes_changed_at(scopes):
+    """Время последнего сброса областей страницы в секундах."""
+    return max(scope_versions(ANONYMOUS_PAGES_ALL, *scopes)) / 1_000_000
+
+
+def anonymous_page_cache_key(scope, path):
+    """
+    Ключ страницы для анонимного посетителя.
+    Содержит версии общей области и области страницы (лента, категория,
+    профиль), поэтому сброс делается сменой версии.
+    """
+    all_version, scope_version = scope_versions(ANONYMOUS_PAGES_ALL, scope)
+    return 'anonymous_page:{}:{}:{}:{}'.format(
+        all_version,
+        scope,
+        scope_version,
+        md5(path.encode()).hexdigest(),
+    )
+
+
+def invalidate_anonymous_pages(*scopes):
+    """
+    Сбрасывает страницы указанных областей: 'index', 'category:<slug>',
+    'profile:<username>', 'post:<id>' или ANONYMOUS_PAGES_ALL.
+    """
+    cache.set_many(
+        {_anonymous_scope_key(scope): _version_now() for scope in scopes},
+        None,
+    )
+
+
+def invalidate_pages_on_commit(*scopes, using=None):
+    """
+    После фиксации транзакции сбрасывает страницы областей и счётчики
+    лент. Для массовых изменений видимости, которые минуют сигналы.
+    """
+    def invalidate():
+        invalidate_anonymous_pages(*scopes)
+        invalidate_feed_counts()
+
+    transaction.on_commit(invalidate, using=using)
+
+
+def next_scheduled_pub_date():
+    """Время публикации ближайшего ещё не видимого поста."""
+    return Post.objects.filter(
+        is_visible=False,
+        is_published=True,
+        category__is_published=True,
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+
+
+def post_page_scopes(category_ids=(), author_ids=()):
+    """Области страниц, на которых выводятся указанные посты."""
+    scopes = {'index'}
+    for slug in Category.objects.filter(
+        pk__in=category_ids
+    ).values_list('slug', flat=True):
+        scopes.add(f'category:{slug}')
+    for username in User.objects.filter(
+        pk__in=author_ids
+    ).values_list('username', flat=True):
+        scopes.add(f'profile:{username}')
+    return scopes
+
+
+def activate_scheduled_posts(now=None):
+    """
+    Делает видимыми посты, время публикации которых наступило.
+    Массовое обновление не вызывает сигналов, поэтому здесь сбрасывается
+    то же, что и при правке поста: карточки, страницы поста, ленты,
+    категории и профиля автора, счётчики лент.
+    """
+    now = now or timezone.now()
+    due = list(Post.objects.filter(
+        is_visible=False,
+        is_published=True,
+        pub_date__lte=now,
+        category__is_published=True,
+    ).values_list(
+        'pk', 'category_id', 'author_id', 'comment_count', 'updated_at'
+    ))
+    if not due:
+        return 0
+    activated = Post.objects.filter(
+        pk__in=[pk for pk, *_ in due]
+    ).sync_visibility(now)
+    invalidate_post_cards(
+        (pk, comment_count, updated_at)
+        for pk, _, _, comment_count, updated_at in due
+    )
+    invalidate_anonymous_pages(
+        *(f'post:{pk}' for pk, *_ in due),
+        *post_page_scopes(
+            category_ids={category_id for _, category_id, *_ in due},
+            author_ids={author_id for _, _, author_id, *_ in due},
+        ),
+    )
+    invalidate_feed_counts()
+    return activated
+
+
+def publication_state():
+    """
+    Пара (время последней отложенной публикации, время ближайшей).
+    Хранится в кеше до публикации ближайшего отложенного поста;
+    любое изменение постов меняет версию ленты и ключ.
+    Когда время отложенной публикации наступает, посты становятся
+    видимыми через activate_scheduled_posts().
+    """
+    index_version, = scope_versions('index')
+    key = f'publication_state:{index_version}'
+    now = timezone.now()
+    state = cache.get(key)
+    if state is None or state[1] is not None and state[1] <= now:
+        next_pub_date = next_scheduled_pub_date()
+        if next_pub_date is not None and next_pub_date <= now:
+            activate_scheduled_posts(now)
+            next_pub_date = next_scheduled_pub_date()
+        state = (state[1] if state else None, next_pub_date)
+        cache.set(key, state, None)
+    return state
+
+
+def anonymous_page_timeout():
+    """
+    Время жизни страницы в кеше.
+    Не дольше, чем до публикации ближайшего отложенного поста,
+    чтобы он появился в ленте вовремя.
+    """
+    timeout = settings.ANONYMOUS_PAGE_CACHE_TIMEOUT
+    _, next_pub_date = publication_state()
+    if next_pub_date is not None:
+        seconds = (next_pub_date - timezone.now()).total_seconds()
+        timeout = min(timeout, max(1, int(seconds) + 1))
+    return timeout
+
+
+def page_validators(scopes, viewer=None):
+    """
+    Валидаторы страницы (ETag и время изменения) по версиям её областей.
+    Считаются без запросов к базе, пока не наступит время отложенной
+    публикации. Версии меняют и фоновые команды, поэтому кеш должен
+    быть общим для процессов — это проверяет blog.checks.
+    """
+    versions = scope_versions(ANONYMOUS_PAGES_ALL, *scopes)
+    published, next_pub_date = publication_state()
+    etag = md5('{}:{}:{}'.format(
+        ':'.join(map(str, versions)), next_pub_date, viewer,
+    ).encode()).hexdigest()
+    last_modified = datetime.fromtimestamp(
+        max(versions) / 1_000_000, tz=dt_timezone.utc
+    )
+    if published is not None:
+        last_modified = max(last_modified, published)
+    return etag, last_modified
+
+
+def conditional_response(request, scopes, get_response, viewer=None):
+    """
+    Отвечает 304, если валидаторы страницы совпали с заголовками
+    If-None-Match/If-Modified-Since, иначе вызывает get_response()
+    и добавляет к ответу ETag и Last-Modified.
+    viewer — то, от чего страница зависит помимо областей: для
+    авторизованного пользователя в него входят сессия и CSRF-токен форм.
+    Такой странице Last-Modified не выдаётся: время изменения не знает
+    о смене сессии, и If-Modified-Since вернул бы страницу с устаревшим
+    токеном. Cache-Control: no-cache велит браузеру проверять страницу
+    при каждом показе, а не отдавать её из кеша по Last-Modified.
+    """
+    etag, last_modified = page_validators(scopes, viewer)
+    etag = quote_etag(etag)
+    last_modified = (
+        None if viewer is not None else int(last_modified.timestamp())
+    )
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = get_response()
+        if response.status_code != 200:
+            return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
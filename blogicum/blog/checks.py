@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Кеши, которые живут внутри одного процесса или ничего не хранят
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Версии страниц, ETag и карточки постов сбрасывают и фоновые команды
+    (publish_scheduled, run_worker, archive_posts), поэтому кеш должен
+    быть общим для всех процессов. Иначе веб-процесс не узнает о сбросе
+    и будет отдавать устаревшие страницы и ответы 304.
+    """
+    errors = []
+    for alias in dict.fromkeys(('default', settings.POST_CARD_CACHE_ALIAS)):
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend in PROCESS_LOCAL_CACHES:
+            errors.append(Error(
+                f'Кеш {alias!r} не общий для процессов: {backend}.',
+                hint=(
+                    'Укажите FileBasedCache, Memcached или Redis, '
+                    'чтобы сбросы из фоновых команд видели веб-процессы.'
+                ),
+                id='blog.E001',
+            ))
+    return errors
@@ -0,0 +1,198 @@
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+
+from .caching import (ANONYMOUS_PAGES_ALL, anonymous_page_cache_key,
+                      anonymous_page_timeout, conditional_response,
+                      scope_versions)
+from .models import Category, User
+from .query_function import get_general_queryset_posts
+
+
+def feed_entry_cache_key(all_version, post_id, updated_at):
+    return f'feed_entry:{all_version}:{post_id}:{updated_at.timestamp()}'
+
+
+def build_feed_entry(post):
+    """Данные записи ленты, не зависящие от формата RSS или Atom."""
+    return {
+        'title': post.title,
+        'description': post.text,
+        'link': reverse('blog:post_detail', kwargs={'post_id': post.pk}),
+        'pubdate': post.pub_date,
+        'updateddate': post.updated_at,
+        'author': post.author.username if post.author else '',
+        'categories': (post.category.title,) if post.category else (),
+    }
+
+
+def feed_entries(queryset, limit):
+    """
+    Записи ленты в порядке queryset.
+    Из базы выбираются только id и updated_at, записи неизменившихся
+    постов берутся из кеша, целиком загружаются лишь новые и изменённые.
+    Правка категорий и локаций меняет общую версию и ключи всех записей.
+    """
+    all_version, = scope_versions(ANONYMOUS_PAGES_ALL)
+    stamps = list(queryset.values_list('pk', 'updated_at')[:limit])
+    keys = {
+        pk: feed_entry_cache_key(all_version, pk, updated_at)
+        for pk, updated_at in stamps
+    }
+    cached = cache.get_many(keys.values())
+    entries = {pk: cached[key] for pk, key in keys.items() if key in cached}
+    missing = keys.keys() - entries.keys()
+    if missing:
+        fresh = {
+            post.pk: build_feed_entry(post)
+            for post in get_general_queryset_posts(
+                filter=False, annotation=False
+            ).filter(pk__in=missing)
+        }
+        cache.set_many(
+            {
+                feed_entry_cache_key(
+                    all_version, pk, entry['updateddate']
+                ): entry
+                for pk, entry in fresh.items()
+            },
+            settings.FEED_ENTRY_CACHE_TIMEOUT,
+        )
+        entries.update(fresh)
+    return [entries[pk] for pk, _ in stamps if pk in entries]
+
+
+class PostsFeed(Feed):
+    """
+    RSS-лента последних публикаций.
+    Готовый ответ кешируется в тех же областях, что и страницы для
+    анонимов, и отдаётся с ETag/Last-Modified, поэтому опрос ленты
+    без изменений обходится без запросов к базе.
+    """
+
+    def __call__(self, request, *args, **kwargs):
+        scope = self.get_feed_scope(**kwargs)
+        return conditional_response(
+            request,
+            [scope],
+            lambda: self.get_cached_response(request, scope, *args, **kwargs),
+        )
+
+    def get_cached_response(self, request, scope, *args, **kwargs):
+        key = anonymous_page_cache_key(scope, request.get_full_path())
+        response = cache.get(key)
+        if response is None:
+            response = super().__call__(request, *args, **kwargs)
+            cache.set(key, response, anonymous_page_timeout())
+        return response
+
+    def get_feed_scope(self, **kwargs):
+        return 'index'
+
+    def get_queryset(self, obj):
+        return get_general_queryset_posts()
+
+    def title(self, obj):
+        return 'Блогикум: новые публикации'
+
+    def description(self, obj):
+        return 'Последние публикации пользователей Блогикума.'
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+    def link(self, obj):
+        return reverse('blog:index')
+
+    def items(self, obj):
+        return feed_entries(self.get_queryset(obj), settings.FEED_ITEMS)
+
+    def item_title(self, item):
+        return item['title']
+
+    def item_description(self, item):
+        return item['description']
+
+    def item_link(self, item):
+        return item['link']
+
+    def item_pubdate(self, item):
+        return item['pubdate']
+
+    def item_updateddate(self, item):
+        return item['updateddate']
+
+    def item_author_name(self, item):
+        return item['author']
+
+    def item_categories(self, item):
+        return item['categories']
+
+
+class CategoryPostsFeed(PostsFeed):
+    """RSS-лента публикаций категории."""
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True
+        )
+
+    def get_feed_scope(self, category_slug):
+        return f'category:{category_slug}'
+
+    def get_queryset(self, obj):
+        return get_general_queryset_posts(manager=obj.posts)
+
+    def title(self, obj):
+        return f'Блогикум: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse(
+            'blog:category_posts', kwargs={'category_slug': obj.slug}
+        )
+
+
+class ProfilePostsFeed(PostsFeed):
+    """RSS-лента опубликованных постов автора."""
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def get_feed_scope(self, username):
+        return f'profile:{username}'
+
+    def get_queryset(self, obj):
+        return get_general_queryset_posts(manager=obj.posts)
+
+    def title(self, obj):
+        return f'Блогикум: публикации {obj.username}'
+
+    def description(self, obj):
+        return f'Публикации пользователя {obj.username}.'
+
+    def link(self, obj):
+        return reverse('blog:profile', kwargs={'username': obj.username})
+
+
+class AtomPostsFeed(PostsFeed):
+    """Atom-лента последних публикаций."""
+
+    feed_type = Atom1Feed
+
+
+class AtomCategoryPostsFeed(CategoryPostsFeed):
+    """Atom-лента публикаций категории."""
+
+    feed_type = Atom1Feed
+
+
+class AtomProfilePostsFeed(ProfilePostsFeed):
+    """Atom-лента опубликованных постов автора."""
+
+    feed_type = Atom1Feed
@@ -0,0 +1,191 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+WEBP = 'webp'
+
+
+def variant_name(name, variant, extension):
+    """post_images/photo.jpg -> post_images/photo.card.webp"""
+    root, _ = os.path.splitext(name)
+    return f'{root}.{variant}.{extension}'
+
+
+def fallback_extension(image):
+    return 'png' if image.mode in ('RGBA', 'LA', 'P') else 'jpg'
+
+
+def variant_names(name):
+    """Все возможные имена уменьшенных копий изображения."""
+    return [
+        variant_name(name, variant, extension)
+        for variant in settings.POST_IMAGE_VARIANTS
+        for extension in (WEBP, 'jpg', 'png')
+    ]
+
+
+def _encode(image, extension):
+    buffer = BytesIO()
+    if extension == WEBP:
+        image.save(buffer, 'WEBP', quality=settings.POST_IMAGE_QUALITY)
+    elif extension == 'png':
+        image.save(buffer, 'PNG', optimize=True)
+    else:
+        image.convert('RGB').save(
+            buffer, 'JPEG', quality=settings.POST_IMAGE_QUALITY,
+            optimize=True, progressive=True,
+        )
+    return ContentFile(buffer.getvalue())
+
+
+def save_exact(storage, name, content):
+    """Сохраняет копию строго под именем name."""
+    if hasattr(storage, 'save_exact'):
+        return storage.save_exact(name, content)
+    storage.delete(name)
+    return storage.save(name, content)
+
+
+def variants_cache_key(name):
+    return f'image_variants:{name}'
+
+
+def has_variants(field_file):
+    smallest = next(iter(settings.POST_IMAGE_VARIANTS))
+    return field_file.storage.exists(
+        variant_name(field_file.name, smallest, WEBP)
+    )
+
+
+def generate_variants(field_file):
+    """
+    Создаёт рядом с оригиналом уменьшенные и пережатые копии изображения:
+    для каждой ширины из POST_IMAGE_VARIANTS — в формате WebP
+    и в формате оригинала (JPEG или PNG). Узкие изображения
+    не увеличиваются.
+    """
+    storage = field_file.storage
+    with storage.open(field_file.name) as original_file:
+        original = Image.open(original_file)
+        original.load()
+    # Фото с телефонов хранят поворот в EXIF: применяем его к пикселям,
+    # иначе копии без метаданных выйдут повёрнутыми
+    original = ImageOps.exif_transpose(original)
+    widths = {}
+    for variant, width in settings.POST_IMAGE_VARIANTS.items():
+        image = original.copy()
+        if image.width > width:
+            image.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+        widths[variant] = image.width
+        for extension in (WEBP, fallback_extension(original)):
+            save_exact(
+                storage,
+                variant_name(field_file.name, variant, extension),
+                _encode(image, extension),
+            )
+    cache.set(
+        variants_cache_key(field_file.name),
+        {'fallback': fallback_extension(original), 'widths': widths},
+        None,
+    )
+
+
+def delete_variants(name, storage):
+    cache.delete(variants_cache_key(name))
+    for variant in variant_names(name):
+        storage.delete(variant)
+
+
+def release_image(name, storage):
+    """
+    Удаляет файл изображения и его копии, если на него больше
+    не ссылается ни один пост. Одинаковые загрузки хранятся одним
+    файлом, поэтому число ссылок считается по полю Post.image
+    в основной и архивной базах.
+    """
+    from .models import Post
+    from .routers import post_databases
+
+    if not name or any(
+        Post.objects.using(database).filter(image=name).exists()
+        for database in post_databases()
+    ):
+        return False
+    storage.delete(name)
+    delete_variants(name, storage)
+    return True
+
+
+def saved_width(storage, name):
+    """Ширина сохранённой копии; читается только заголовок файла."""
+    with storage.open(name) as image_file:
+        return Image.open(image_file).width
+
+
+def describe_variants(storage, name):
+    """
+    Формат и ширины копий, определённые по файлам, или None, если копий
+    ещё нет. Нужно для копий, созданных до появления записи в кеше
+    или вытесненных из него.
+    """
+    variants = settings.POST_IMAGE_VARIANTS
+    smallest = next(iter(variants))
+    if not storage.exists(variant_name(name, smallest, WEBP)):
+        return None
+    fallback = 'jpg'
+    if storage.exists(variant_name(name, smallest, 'png')):
+        fallback = 'png'
+    largest = max(variants, key=variants.get)
+    limit = saved_width(storage, variant_name(name, largest, WEBP))
+    return {
+        'fallback': fallback,
+        'widths': {
+            variant: min(width, limit) for variant, width in variants.items()
+        },
+    }
+
+
+def image_srcsets(field_file):
+    """
+    Возвращает srcset копий в WebP и в формате оригинала
+    и адрес самой маленькой копии. Если копии ещё не созданы,
+    возвращает None.
+    Ширины в srcset — настоящие: у изображения уже самой большой копии
+    копии не увеличиваются, и вместо нескольких одинаковых копий
+    в srcset попадает одна с шириной оригинала. Формат и ширины
+    записывает в кеш generate_variants, поэтому при выводе страницы
+    файлы копий не открываются.
+    """
+    storage = field_file.storage
+    key = variants_cache_key(field_file.name)
+    info = cache.get(key)
+    if info is None:
+        info = describe_variants(storage, field_file.name)
+        if info is None:
+            return None
+        cache.set(key, info, None)
+    variants = settings.POST_IMAGE_VARIANTS
+    widths = {}
+    for variant in sorted(variants, key=variants.get):
+        if variant in info['widths']:
+            widths.setdefault(info['widths'][variant], variant)
+
+    def srcset(extension):
+        return ', '.join(
+            f'{storage.url(variant_name(field_file.name, variant, extension))}'
+            f' {width}w'
+            for width, variant in widths.items()
+        )
+
+    smallest = next(iter(variants))
+    return {
+        'webp': srcset(WEBP),
+        'fallback': srcset(info['fallback']),
+        'src': storage.url(
+            variant_name(field_file.name, smallest, info['fallback'])
+        ),
+    }
@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.archive import archive_batch, archive_horizon, refresh_references
+from blog.routers import get_archive
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты старше горизонта вместе с комментариями '
+        'в архивную базу ARCHIVE_DATABASE пачками. Каждая пачка '
+        'фиксируется отдельно, поэтому прерванный перенос продолжается '
+        'повторным запуском. Перед переносом обновляет в архиве копии '
+        'пользователей, категорий и локаций.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_HORIZON_DAYS,
+            help='Переносить посты, опубликованные раньше стольких дней назад.'
+        )
+        parser.add_argument(
+            '--batch', type=int, default=settings.ARCHIVE_BATCH_SIZE,
+            help='Число постов в одной транзакции.'
+        )
+        parser.add_argument(
+            '--max-batches', type=int, default=None,
+            help='Остановиться после стольких пачек.'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0.0,
+            help='Пауза в секундах между пачками, чтобы не мешать записи.'
+        )
+
+    def handle(self, *args, **options):
+        archive = get_archive()
+        if archive is None:
+            raise CommandError('Архивная база ARCHIVE_DATABASE не задана.')
+        if options['batch'] < 1:
+            raise CommandError('Размер пачки должен быть положительным.')
+        refresh_references(archive, options['batch'])
+        horizon = archive_horizon(options['days'])
+        moved = batches = 0
+        while options['max_batches'] is None or (
+            batches < options['max_batches']
+        ):
+            count = archive_batch(horizon, options['batch'], archive)
+            if not count:
+                break
+            moved += count
+            batches += 1
+            self.stdout.write(f'Перенесено постов: {moved}')
+            time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(
+            f'В архив перенесено постов: {moved} '
+            f'(опубликованы раньше {horizon:%d.%m.%Y})'
+        ))
@@ -0,0 +1,151 @@
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+from blog.management.commands.recount_comments import recount_comments
+from blog.models import Comment, Post
+from blog.query_function import get_general_queryset_posts
+from blog.tasks import init_worker_process
+from blog.transactions import serialized_write
+
+BENCH_COMMENT_TEXT = 'bench_concurrency'
+
+
+def percentile(values, percent):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    rank = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def create_comment(post_id, author_id, number):
+    post = Post.objects.get(pk=post_id)
+    Comment.objects.create(
+        post=post, author_id=author_id,
+        text=f'{BENCH_COMMENT_TEXT} {number}',
+    )
+
+
+def run_writer(mode, duration, post_id, author_id):
+    """Пишет комментарии, пока не истечёт duration секунд."""
+    write = partial(create_comment, post_id, author_id)
+    if mode == 'serialized':
+        write = serialized_write(write)
+    else:
+        write = transaction.atomic(write)
+    return run_loop('writer', duration, write)
+
+
+def run_reader(duration, post_id):
+    """Читает ленту и комментарии поста, пока не истечёт duration секунд."""
+    def read(number):
+        list(get_general_queryset_posts()[:10])
+        list(Comment.objects.filter(post_id=post_id).select_related(
+            'author'
+        )[:20])
+    return run_loop('reader', duration, read)
+
+
+def run_loop(role, duration, operation):
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    number = 0
+    while time.monotonic() < deadline:
+        number += 1
+        start = time.perf_counter()
+        try:
+            operation(number)
+        except OperationalError:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    connections.close_all()
+    return {'role': role, 'latencies': latencies, 'errors': errors}
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест SQLite: N процессов пишут комментарии, '
+        'M процессов читают ленту. Пишет в настроенную базу, созданные '
+        'комментарии удаляются по окончании; запускайте на копии базы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--writers', type=int, default=4,
+            help='Число пишущих процессов.'
+        )
+        parser.add_argument(
+            '--readers', type=int, default=4,
+            help='Число читающих процессов.'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=10.0,
+            help='Длительность каждого прогона в секундах.'
+        )
+        parser.add_argument(
+            '--mode', choices=('plain', 'serialized', 'both'),
+            default='both',
+            help=(
+                'plain — обычная транзакция, serialized — BEGIN IMMEDIATE '
+                'с повторами, both — оба прогона подряд.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        post = Post.objects.filter(author__isnull=False).first()
+        if post is None:
+            raise CommandError('Для замера нужен хотя бы один пост.')
+        modes = (
+            ('plain', 'serialized') if options['mode'] == 'both'
+            else (options['mode'],)
+        )
+        try:
+            for mode in modes:
+                self.report(mode, self.run(mode, post, options), options)
+        finally:
+            Comment.objects.filter(
+                text__startswith=BENCH_COMMENT_TEXT
+            ).delete()
+            recount_comments(Post.objects.filter(pk=post.pk))
+
+    def run(self, mode, post, options):
+        connections.close_all()
+        workers = options['writers'] + options['readers']
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker_process
+        ) as executor:
+            futures = [
+                executor.submit(
+                    run_writer, mode, options['duration'],
+                    post.pk, post.author_id,
+                )
+                for _ in range(options['writers'])
+            ] + [
+                executor.submit(run_reader, options['duration'], post.pk)
+                for _ in range(options['readers'])
+            ]
+            return [future.result() for future in futures]
+
+    def report(self, mode, results, options):
+        self.stdout.write(self.style.WARNING(f'Режим {mode}:'))
+        for role in ('writer', 'reader'):
+            latencies = [
+                latency for result in results if result['role'] == role
+                for latency in result['latencies']
+            ]
+            errors = sum(
+                result['errors'] for result in results
+                if result['role'] == role
+            )
+            self.stdout.write(
+                f'  {role}: {len(latencies) / options["duration"]:.1f} '
+                f'оп/с, p50 {percentile(latencies, 50):.1f} мс, '
+                f'p95 {percentile(latencies, 95):.1f} мс, ошибок {errors}'
+            )
@@ -0,0 +1,118 @@
+import os
+import re
+
+from django.core.management.base import BaseCommand
+
+from blog.caching import (ANONYMOUS_PAGES_ALL, invalidate_anonymous_pages,
+                          post_card_cache)
+from blog.images import (delete_variants, generate_variants, has_variants,
+                         variant_names)
+from blog.models import Post
+from blog.routers import get_archive, post_databases
+from blog.tasks import enqueue
+
+CONTENT_ADDRESSED_NAME = re.compile(r'/[0-9a-f]{2}/[0-9a-f]{64}\.\w+$')
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит изображения постов в хранилище с адресацией '
+        'по содержимому, объединяя одинаковые файлы. '
+        'С --delete-orphans удаляет файлы, на которые нет ссылок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет сделано.'
+        )
+        parser.add_argument(
+            '--delete-orphans', action='store_true',
+            help='Удалить файлы каталога загрузок без ссылок из постов.'
+        )
+
+    def handle(self, *args, **options):
+        field = Post._meta.get_field('image')
+        self.storage = field.storage
+        self.dry_run = options['dry_run']
+        moved = self.dedupe()
+        removed = 0
+        if options['delete_orphans']:
+            removed = self.delete_orphans(field.upload_to.rstrip('/'))
+        if moved and not self.dry_run:
+            post_card_cache().clear()
+            invalidate_anonymous_pages(ANONYMOUS_PAGES_ALL)
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено файлов: {moved}, удалено без ссылок: {removed}'
+        ))
+
+    def dedupe(self):
+        moved = 0
+        for name in sorted(self.referenced_names()):
+            if CONTENT_ADDRESSED_NAME.search(name):
+                continue
+            if not self.storage.exists(name):
+                self.stderr.write(f'Файл не найден: {name}')
+                continue
+            moved += 1
+            if self.dry_run:
+                self.stdout.write(f'{name} -> (хеш содержимого)')
+                continue
+            with self.storage.open(name) as original:
+                new_name = self.storage.save(name, original)
+            for database in post_databases():
+                Post.objects.using(database).filter(image=name).update(
+                    image=new_name
+                )
+            self.storage.delete(name)
+            delete_variants(name, self.storage)
+            self.stdout.write(f'{name} -> {new_name}')
+            post = Post.objects.filter(image=new_name).first()
+            if post is None:
+                archived = Post.objects.using(get_archive()).filter(
+                    image=new_name
+                ).first()
+                if not has_variants(archived.image):
+                    generate_variants(archived.image)
+            elif not has_variants(post.image):
+                enqueue(
+                    'generate_post_image_variants',
+                    post_id=post.pk,
+                    image_name=new_name,
+                )
+        return moved
+
+    def referenced_names(self):
+        """Имена изображений постов основной и архивной баз."""
+        names = set()
+        for database in post_databases():
+            names.update(
+                Post.objects.using(database).exclude(image='').values_list(
+                    'image', flat=True
+                ).order_by().distinct().iterator()
+            )
+        return names
+
+    def iter_files(self, directory):
+        directories, files = self.storage.listdir(directory)
+        for filename in files:
+            yield f'{directory}/{filename}'
+        for subdirectory in directories:
+            yield from self.iter_files(f'{directory}/{subdirectory}')
+
+    def delete_orphans(self, directory):
+        if not os.path.isdir(self.storage.path(directory)):
+            return 0
+        referenced = set()
+        for name in self.referenced_names():
+            referenced.add(name)
+            referenced.update(variant_names(name))
+        removed = 0
+        for name in self.iter_files(directory):
+            if name in referenced:
+                continue
+            removed += 1
+            self.stdout.write(f'Без ссылок: {name}')
+            if not self.dry_run:
+                self.storage.delete(name)
+        return removed
@@ -0,0 +1,137 @@
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from blog.models import Category, Post
+from blog.query_function import get_general_queryset_posts
+
+User = get_user_model()
+SEED_BATCH_SIZE = 10_000
+SEED_CATEGORIES = 20
+SEED_AUTHORS = 100
+# Индексы, которые обслуживают ленты; остальные индексы Post не трогаем,
+# чтобы сравнение показывало вклад именно этих индексов
+FEED_INDEX_NAMES = frozenset((
+    'post_visible_feed_idx',
+    'post_visible_category_idx',
+    'post_author_feed_idx',
+))
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает план и время запросов ленты. '
+        'С --seed заполняет базу тестовыми публикациями, '
+        'с --compare сравнивает планы без индексов ленты и с ними.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Сколько публикаций добавить перед замером (например, '
+                 '1000000).'
+        )
+        parser.add_argument(
+            '--compare', action='store_true',
+            help='Временно удалить индексы ленты и показать план без них.'
+        )
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'])
+        if options['compare']:
+            with self.without_feed_indexes():
+                self.stdout.write(self.style.WARNING('Без индексов ленты:'))
+                self.report()
+            self.stdout.write(self.style.WARNING('С индексами ленты:'))
+        self.report()
+
+    def get_querysets(self):
+        category = Category.objects.filter(is_published=True).first()
+        author = User.objects.first()
+        querysets = {'index': get_general_queryset_posts()}
+        if category:
+            querysets['category'] = get_general_queryset_posts(
+                manager=category.posts
+            )
+        if author:
+            querysets['profile'] = get_general_queryset_posts(
+                manager=author.posts
+            )
+            querysets['profile (автор)'] = get_general_queryset_posts(
+                manager=author.posts, filter=False
+            )
+        return querysets
+
+    def report(self):
+        for name, queryset in self.get_querysets().items():
+            page = queryset[:10]
+            start = time.perf_counter()
+            list(page)
+            elapsed = (time.perf_counter() - start) * 1000
+            self.stdout.write(f'{name}: {elapsed:.1f} мс')
+            self.stdout.write(page.explain())
+
+    @contextmanager
+    def without_feed_indexes(self):
+        indexes = [
+            index for index in Post._meta.indexes
+            if index.name in FEED_INDEX_NAMES
+        ]
+        self.stdout.write('Удаление индексов ленты...')
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(Post, index)
+        try:
+            yield
+        finally:
+            self.stdout.write('Восстановление индексов ленты...')
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.add_index(Post, index)
+
+    @transaction.atomic
+    def seed(self, total):
+        authors = [
+            User.objects.get_or_create(username=f'bench_author_{i}')[0]
+            for i in range(SEED_AUTHORS)
+        ]
+        categories = [
+            Category.objects.get_or_create(
+                slug=f'bench-{i}',
+                defaults={
+                    'title': f'Категория {i}',
+                    'description': 'Категория для замеров',
+                    'is_published': i % 10 != 0,
+                },
+            )[0]
+            for i in range(SEED_CATEGORIES)
+        ]
+        offset = Post.objects.count()
+        now = timezone.now()
+        for start in range(0, total, SEED_BATCH_SIZE):
+            Post.objects.bulk_create(
+                Post(
+                    title=f'Публикация {number}',
+                    text=f'Текст публикации {number}',
+                    pub_date=now - timezone.timedelta(minutes=number),
+                    is_published=number % 20 != 0,
+                    is_visible=(
+                        number % 20 != 0
+                        and categories[number % SEED_CATEGORIES].is_published
+                    ),
+                    author=authors[number % SEED_AUTHORS],
+                    category=categories[number % SEED_CATEGORIES],
+                )
+                for number in range(
+                    offset + start,
+                    offset + min(start + SEED_BATCH_SIZE, total)
+                )
+            )
+            self.stdout.write(
+                f'Добавлено {min(start + SEED_BATCH_SIZE, total)} из {total}'
+            )
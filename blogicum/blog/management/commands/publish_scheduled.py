@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.caching import activate_scheduled_posts, next_scheduled_pub_date
+
+
+class Command(BaseCommand):
+    help = (
+        'Публикует отложенные посты, время которых наступило, и сбрасывает '
+        'кеши страниц с ними. Работает, пока его не остановят, '
+        'или один проход с --once (для запуска по cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Опубликовать посты, время которых уже наступило, и выйти.'
+        )
+        parser.add_argument(
+            '--max-sleep', type=float, default=60.0,
+            help=(
+                'Наибольшая пауза в секундах между проверками: посты, '
+                'отложенные другими процессами, заметятся не позже.'
+            )
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            activated = activate_scheduled_posts()
+            if activated:
+                self.stdout.write(f'Опубликовано постов: {activated}')
+            if options['once']:
+                break
+            time.sleep(self.get_sleep(options['max_sleep']))
+
+    def get_sleep(self, max_sleep):
+        """Пауза до ближайшей отложенной публикации, но не дольше max_sleep."""
+        next_pub_date = next_scheduled_pub_date()
+        if next_pub_date is None:
+            return max_sleep
+        seconds = (next_pub_date - timezone.now()).total_seconds()
+        return min(max_sleep, max(0.1, seconds))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.caching import ANONYMOUS_PAGES_ALL, invalidate_anonymous_pages
+from blog.models import Comment, Post
+
+
+def recount_comments(queryset=None):
+    """
+    Пересчитывает поле comment_count у постов одним запросом.
+    Обновляются только посты с неверным счётчиком: update() ставит
+    updated_at, а от него зависят ключи кеша карточек и выгрузки.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    comments = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    actual = Coalesce(Subquery(comments, output_field=IntegerField()), 0)
+    return queryset.exclude(comment_count=actual).update(
+        comment_count=actual
+    )
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у публикаций.'
+
+    def handle(self, *args, **options):
+        updated = recount_comments()
+        if updated:
+            # Массовый update() не вызывает сигналов: счётчики
+            # комментариев выводятся во всех лентах, сбрасываем все
+            invalidate_anonymous_pages(ANONYMOUS_PAGES_ALL)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+from blog.search import clear_index, index_posts, search_database
+
+
+def reindex_search(batch_size=500):
+    """Перестраивает поисковый индекс постов пачками по batch_size."""
+    total = 0
+    database = search_database()
+    with transaction.atomic(using=database):
+        clear_index()
+        batch = []
+        posts = Post.objects.using(database).only(
+            'id', 'title', 'text'
+        ).order_by('pk')
+        for post in posts.iterator(chunk_size=batch_size):
+            batch.append(post)
+            if len(batch) == batch_size:
+                index_posts(batch, replace=False)
+                total += len(batch)
+                batch = []
+        index_posts(batch, replace=False)
+        total += len(batch)
+    return total
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый поисковый индекс публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch',
+            type=int,
+            default=500,
+            help='Сколько постов индексировать за один проход.',
+        )
+
+    def handle(self, *args, **options):
+        total = reindex_search(options['batch'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано публикаций: {total}')
+        )
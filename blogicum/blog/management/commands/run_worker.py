@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.tasks import init_worker_process, run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задачи из очереди в пуле процессов. '
+        'Работает, пока его не остановят, или один проход с --once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=2,
+            help='Число процессов в пуле.'
+        )
+        parser.add_argument(
+            '--batch', type=int, default=20,
+            help='Сколько задач забирать из очереди за раз.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить задачи, которые уже в очереди, и выйти.'
+        )
+
+    def handle(self, *args, **options):
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=options['processes'],
+            initializer=init_worker_process,
+        ) as executor:
+            while True:
+                done = run_pending_jobs(options['batch'], executor)
+                if done:
+                    self.stdout.write(f'Выполнено задач: {done}')
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['sleep'])
@@ -0,0 +1,43 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from blog.routers import mark_replica_synced
+
+
+def sync_replica(alias, source='default'):
+    """
+    Копирует основную базу SQLite в файл реплики через backup API:
+    копия согласованная и снимается без остановки записи. Если база
+    меняется во время копирования, backup начинается заново, поэтому
+    реплика получает все записи, зафиксированные до начала копирования.
+    """
+    target_settings = connections[alias].settings_dict
+    if connections[source].vendor != 'sqlite' or (
+        'sqlite' not in target_settings['ENGINE']
+    ):
+        raise CommandError('Копировать можно только базы SQLite.')
+    connections[source].ensure_connection()
+    connections[alias].close()
+    started = time.time()
+    target = sqlite3.connect(str(target_settings['NAME']))
+    try:
+        connections[source].connection.backup(target)
+    finally:
+        target.close()
+    mark_replica_synced(alias, started)
+
+
+class Command(BaseCommand):
+    help = (
+        'Обновляет реплики SQLite из DATABASE_REPLICAS копией основной '
+        'базы. Запускайте по расписанию, например раз в минуту.'
+    )
+
+    def handle(self, *args, **options):
+        for alias in settings.DATABASE_REPLICAS:
+            sync_replica(alias)
+            self.stdout.write(self.style.SUCCESS(f'Реплика {alias} обновлена'))
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+
+PRIMARY_COOKIE = 'db_written_at'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+def last_write_time(request):
+    """
+    Время последней записи пользователя в секундах или 0.
+    Читать ему можно только с реплик, скопированных позже.
+    """
+    try:
+        return float(request.COOKIES.get(PRIMARY_COOKIE, 0))
+    except ValueError:
+        return 0
+
+
+class ReplicaStickinessMiddleware:
+    """
+    После успешного запроса на запись ставит cookie со временем записи:
+    пока реплики не скопированы позже него, пользователь читает основную
+    базу, иначе он не увидел бы свой новый пост или комментарий.
+    Cookie живёт REPLICA_STICKY_SECONDS — не меньше наибольшего
+    отставания реплик.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 10 * 60)
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                f'{time.time():.6f}',
+                max_age=seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
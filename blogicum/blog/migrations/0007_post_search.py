@@ -0,0 +1,34 @@
+from django.db import migrations
+
+from blog.search import SEARCH_TABLE, stem_text
+
+
+def fill_search_index(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            [
+                (pk, stem_text(title), stem_text(text))
+                for pk, title, text in Post.objects.values_list(
+                    'pk', 'title', 'text'
+                ).iterator()
+            ],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            f'CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5('
+            "title, text, tokenize = 'unicode61 remove_diacritics 2')",
+            f'DROP TABLE {SEARCH_TABLE}',
+        ),
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
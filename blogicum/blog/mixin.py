@@ -1,9 +1,73 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404, redirect
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.shortcuts import redirect
 from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
+from .archive import with_archive
+from .caching import (anonymous_page_cache_key, anonymous_page_timeout,
+                      conditional_response, scopes_changed_at)
 from .forms import CommentForm, PostForm
+from .middleware import last_write_time
 from .models import Comment, Post
+from .paginator import (CachedCountPaginator, KeysetPaginator,
+                        feed_count_cache_key)
+from .routers import replica_reads
+from .transactions import serialized_write
+from .uploads import LimitedImageUploadHandler
+
+
+class UploadErrorsMixin:
+    """
+    Ограничивает загрузки представления обработчиком
+    LimitedImageUploadHandler и добавляет в форму ошибки файлов,
+    которые он отклонил до проверки формы.
+    Обработчики загрузок можно менять только до чтения request.POST,
+    а его читает CsrfViewMiddleware, поэтому проверка CSRF
+    выполняется внутри dispatch, после подключения обработчика.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers.insert(
+            0, LimitedImageUploadHandler(request)
+        )
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        for field, error in getattr(
+            self.request, 'upload_errors', {}
+        ).items():
+            form.add_error(field, error)
+        return form
+
+
+class SerializedWriteMixin:
+    """
+    Сохраняет форму в одной транзакции, которая сразу берёт блокировку
+    на запись и повторяется, если база занята другим процессом.
+    Перед каждой попыткой объект формы возвращается в исходное
+    состояние: после отката неудачной попытки у нового объекта
+    не должно остаться первичного ключа из откаченной вставки.
+    """
+
+    def form_valid(self, form):
+        instance = form.instance
+        pk, adding = instance.pk, instance._state.adding
+        form_valid = super().form_valid
+
+        def attempt(form):
+            instance.pk, instance._state.adding = pk, adding
+            return form_valid(form)
+
+        return serialized_write(attempt)(form)
 
 
 class PostMixin:
@@ -15,14 +79,186 @@ class PostMixin:
     pk_url_kwarg = 'post_id'
 
 
-class EditContentMixin(LoginRequiredMixin):
+class RequestCacheMixin:
     """
-    Проверку авторства для редактирования и удаления поста.
+    Запоминает результаты поиска объектов на время одного запроса,
+    чтобы get_queryset и get_context_data не повторяли одинаковые запросы.
+    """
+
+    def get_cached(self, key, lookup):
+        cached = self.__dict__.setdefault('_request_cache', {})
+        if key not in cached:
+            cached[key] = lookup()
+        return cached[key]
+
+
+class ConditionalGetMixin:
+    """
+    Отвечает 304 на If-None-Match/If-Modified-Since до выборки постов
+    и рендеринга шаблона.
+    Валидаторы строятся по версиям областей из get_validator_scopes(),
+    их меняют те же сигналы, что сбрасывают кеш страниц.
+    """
+
+    def get_validator_scopes(self):
+        return [self.get_page_cache_scope()]
+
+    def get_validator_viewer(self):
+        """
+        Авторизованному пользователю страница выводит формы с CSRF-токеном,
+        который меняется при входе, поэтому ETag зависит от сессии и токена.
+        """
+        request = self.request
+        if not request.user.is_authenticated:
+            return None
+        return '{}:{}:{}'.format(
+            request.user.pk,
+            request.session.session_key,
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        return conditional_response(
+            request,
+            self.get_validator_scopes(),
+            lambda: super(ConditionalGetMixin, self).dispatch(
+                request, *args, **kwargs
+            ),
+            viewer=self.get_validator_viewer(),
+        )
+
+
+class AnonymousPageCacheMixin:
+    """
+    Кеширует страницу целиком для неавторизованных посетителей.
+    Наследники задают область страницы в get_page_cache_scope(),
+    по ней сигналы сбрасывают кеш.
+    """
+
+    def get_page_cache_scope(self):
+        return 'index'
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = anonymous_page_cache_key(
+            self.get_page_cache_scope(), request.get_full_path()
+        )
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and not response.cookies:
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key, rendered, anonymous_page_timeout()
+                )
+            )
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Читает данные страницы с реплики, которая уже получила последнюю
+    запись пользователя и последнее изменение областей страницы,
+    а если такой нет — с основной базы. Так страница с реплики не
+    попадёт в кеш и не получит ETag под версией новее её данных.
+    Шаблон рендерится внутри replica_reads(): выборки постов ленивые
+    и выполняются только при рендеринге.
+    """
+
+    def get_replica_scopes(self):
+        return self.get_validator_scopes()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        since = max(
+            last_write_time(request),
+            scopes_changed_at(self.get_replica_scopes()),
+        )
+        with replica_reads(since=since):
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        return response
+
+
+class ArchiveFeedMixin:
+    """
+    Продолжает ленту постами из архивной базы: глубокие страницы
+    читаются оттуда, когда посты основной базы закончились.
+    Должен стоять перед KeysetPaginationMixin.
+    """
+
+    def paginate_queryset(self, queryset, page_size):
+        return super().paginate_queryset(with_archive(queryset), page_size)
+
+
+class KeysetPaginationMixin:
+    """
+    Включает курсорную пагинацию списка постов вместо постраничной,
+    если в настройках задано KEYSET_PAGINATION = True.
+    """
+
+    keyset_pagination = None
+
+    def use_keyset_pagination(self):
+        if self.keyset_pagination is not None:
+            return self.keyset_pagination
+        return getattr(settings, 'KEYSET_PAGINATION', False)
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before'),
+            )
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class CachedCountMixin:
+    """
+    Кеширует общее число постов ленты для пагинатора.
+    Наследники описывают ленту в get_count_cache_parts().
+    """
+
+    paginator_class = CachedCountPaginator
+
+    def get_count_cache_parts(self):
+        return {}
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset,
+            per_page,
+            cache_key=feed_count_cache_key(**self.get_count_cache_parts()),
+            **kwargs
+        )
+
+
+class AuthorRequiredMixin(LoginRequiredMixin):
+    """
+    Проверка авторства объекта за один запрос к базе.
+    Объект загружается один раз и сохраняется во view, автор
+    сравнивается по author_id без загрузки пользователя.
     Если проверка провалена, то возвращает на страницу поста.
     """
 
+    def get_object(self, queryset=None):
+        if '_object' not in self.__dict__:
+            self._object = super().get_object(queryset)
+        return self._object
+
     def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
+        if self.get_object().author_id != request.user.pk:
             return redirect(
                 'blog:post_detail',
                 post_id=self.kwargs['post_id']
@@ -30,6 +266,13 @@ class EditContentMixin(LoginRequiredMixin):
         return super().dispatch(request, *args, **kwargs)
 
 
+class EditContentMixin(AuthorRequiredMixin):
+    """
+    Проверку авторства для редактирования и удаления поста.
+    Если проверка провалена, то возвращает на страницу поста.
+    """
+
+
 class CommentMixin:
     """Основные настройки класса Comment"""
 
@@ -39,21 +282,14 @@ class CommentMixin:
     pk_url_kwarg = 'comment_id'
 
 
-class CommentUpdateDeleteMixin(LoginRequiredMixin):
+class CommentUpdateDeleteMixin(AuthorRequiredMixin):
     """
     Проверку авторства для редактирования и удаления коментария.
     Если проверка провалена, то возвращает на страницу поста.
     """
 
-    def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(
-            Comment,
-            pk=self.kwargs['comment_id'],
-            post_id=self.kwargs['post_id'],
-        )
-        if instance.author != request.user:
-            return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
-        return super().dispatch(request, *args, **kwargs)
+    def get_queryset(self):
+        return Comment.objects.filter(post_id=self.kwargs['post_id'])
 
     def get_success_url(self):
         return reverse(
@@ -1,14 +1,162 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
+
+from .storage import post_image_storage
 
 User = get_user_model()
 HEADER_LIMIT_STR = 256
 HARACTER_LIMIT_STR = 25
 
 
+class UpdatedAtQuerySet(models.QuerySet):
+    """
+    QuerySet, который при массовом update() тоже обновляет updated_at,
+    как это делает save() для поля с auto_now.
+    """
+
+    def update(self, **kwargs):
+        kwargs.setdefault('updated_at', timezone.now())
+        return super().update(**kwargs)
+
+    update.alters_data = True
+
+
+class UpdatedAtField(models.DateTimeField):
+    """Индексированная дата последнего изменения записи."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('auto_now', True)
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+
+class PostQuerySet(UpdatedAtQuerySet):
+    """
+    QuerySet постов, который поддерживает в актуальном виде is_visible
+    и поисковый индекс при массовых изменениях, минующих сигналы.
+    """
+
+    VISIBILITY_FIELDS = frozenset(
+        ('is_published', 'pub_date', 'category', 'category_id')
+    )
+    SEARCH_FIELDS = frozenset(('title', 'text'))
+
+    def update(self, **kwargs):
+        from .search import search_database
+
+        sync = (
+            'is_visible' not in kwargs
+            and bool(self.VISIBILITY_FIELDS & set(kwargs))
+        )
+        reindex = bool(self.SEARCH_FIELDS & set(kwargs)) and (
+            (self._db or search_database()) == search_database()
+        )
+        if not sync and not reindex:
+            return super().update(**kwargs)
+        scopes = list(self.values_list('pk', 'category_id', 'author_id'))
+        pks = [pk for pk, _, _ in scopes]
+        updated = super().update(**kwargs)
+        posts = self.model.objects.using(self._db).filter(pk__in=pks)
+        if sync:
+            posts.sync_visibility()
+            self.invalidate_pages(scopes, posts)
+        if reindex:
+            from .search import index_posts
+
+            index_posts(posts.only('id', 'title', 'text'))
+        return updated
+
+    update.alters_data = True
+
+    def invalidate_pages(self, before, posts):
+        """
+        Сбрасывает после фиксации страницы постов и лент, где они
+        выводились до изменения (before — тройки id, категория, автор)
+        и выводятся после него.
+        """
+        from .caching import invalidate_pages_on_commit, post_page_scopes
+
+        after = list(posts.values_list('pk', 'category_id', 'author_id'))
+        rows = before + after
+        invalidate_pages_on_commit(
+            *{f'post:{pk}' for pk, _, _ in rows},
+            *post_page_scopes(
+                category_ids={category for _, category, _ in rows} - {None},
+                author_ids={author for _, _, author in rows},
+            ),
+            using=self.db,
+        )
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        bulk_create не отправляет post_save, поэтому новые посты
+        добавляются в поисковый индекс отдельно. В SQLite bulk_create
+        не возвращает id, так что индексируются посты с id больше
+        наибольшего до вставки и посты с заданным id.
+        """
+        from .search import index_missing_posts, search_database
+
+        if (self._db or search_database()) != search_database():
+            return super().bulk_create(objs, *args, **kwargs)
+        objs = list(objs)
+        last = self.model._base_manager.using(self._db).aggregate(
+            last=models.Max('pk')
+        )['last'] or 0
+        created = super().bulk_create(objs, *args, **kwargs)
+        index_missing_posts(self.model._base_manager.filter(
+            models.Q(pk__gt=last)
+            | models.Q(pk__in=[obj.pk for obj in objs if obj.pk is not None])
+        ))
+        return created
+
+    def sync_visibility(self, now=None):
+        """
+        Пересчитывает is_visible у постов выборки.
+        Обновляет только строки, у которых флаг действительно меняется.
+        """
+        visible = models.Q(
+            is_published=True,
+            pub_date__lte=now or timezone.now(),
+            category__is_published=True,
+        )
+        return (
+            self.filter(visible, is_visible=False).update(is_visible=True)
+            + self.exclude(visible).filter(is_visible=True).update(
+                is_visible=False
+            )
+        )
+
+    sync_visibility.alters_data = True
+
+
+class CategoryQuerySet(UpdatedAtQuerySet):
+    """QuerySet категорий, который пересчитывает видимость их постов."""
+
+    def update(self, **kwargs):
+        if 'is_published' not in kwargs:
+            return super().update(**kwargs)
+        from .caching import ANONYMOUS_PAGES_ALL, invalidate_pages_on_commit
+
+        pks = list(self.values_list('pk', flat=True))
+        updated = super().update(**kwargs)
+        Post.objects.using(self._db).filter(
+            category__in=pks
+        ).sync_visibility()
+        if updated:
+            # Категории выводятся во всех лентах: сбрасываем все страницы
+            invalidate_pages_on_commit(ANONYMOUS_PAGES_ALL, using=self.db)
+        return updated
+
+    update.alters_data = True
+
+
 class PublishedModel(models.Model):
-    """Модель добвляет для публикаций флаг и дату создания. Абстрактная"""
+    """
+    Модель добвляет для публикаций флаг, дату создания и дату
+    последнего изменения. Абстрактная
+    """
 
     is_published = models.BooleanField(
         default=True,
@@ -19,6 +167,11 @@ class PublishedModel(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено'
     )
+    updated_at = UpdatedAtField(
+        verbose_name='Изменено'
+    )
+
+    objects = UpdatedAtQuerySet.as_manager()
 
     class Meta:
         abstract = True
@@ -45,6 +198,8 @@ class Category(PublishedModel):
             ' разрешены символы латиницы, цифры, дефис и подчёркивание.')
     )
 
+    objects = CategoryQuerySet.as_manager()
+
     def get_absolute_url(self):
         return reverse('blog:category', kwargs={'pk': self.pk})
 
@@ -110,17 +265,87 @@ class Post(PublishedModel):
     image = models.ImageField(
         verbose_name='Фото',
         upload_to='post_images/',
+        storage=post_image_storage,
         blank=True,
+        db_index=True,
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Виден на сайте',
+        help_text=(
+            'Опубликован, категория опубликована'
+            ' и время публикации наступило.')
+    )
+
+    objects = PostQuerySet.as_manager()
 
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'pk': self.pk})
 
+    def compute_is_visible(self, now=None):
+        return bool(
+            self.is_published
+            and self.pub_date <= (now or timezone.now())
+            and self.category_id is not None
+            and self.category.is_published
+        )
+
+    def save(self, *args, **kwargs):
+        """
+        Пересчитывает is_visible. Счётчик комментариев меняют только
+        F()-обновления сигналов, поэтому при сохранении существующего
+        поста он не записывается: иначе правка поста затёрла бы
+        комментарии, добавленные после его загрузки.
+        """
+        self.is_visible = self.compute_is_visible()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'is_visible'}
+        elif (
+            not self._state.adding and self.pk is not None
+            and not args and not kwargs.get('force_insert')
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'comment_count'
+            ]
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(is_visible=True),
+                name='post_visible_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                condition=models.Q(is_visible=True),
+                name='post_visible_category_idx',
+            ),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_visible=False, is_published=True),
+                name='post_scheduled_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_feed_idx',
+            ),
+            models.Index(
+                fields=('-pub_date',),
+                name='post_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
@@ -145,6 +370,88 @@ class Comment(PublishedModel):
         verbose_name_plural = 'коментарии'
         default_related_name = 'comments'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('created_at',),
+                name='comment_created_idx',
+            ),
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_page_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text
+
+
+class Job(models.Model):
+    """Модель описывает фоновую задачу локальной очереди"""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(
+        max_length=HEADER_LIMIT_STR,
+        verbose_name='Задача'
+    )
+    kwargs = models.JSONField(
+        default=dict,
+        verbose_name='Параметры'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Ошибка'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Начало выполнения'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Окончание выполнения'
+    )
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        ordering = ('-created_at',)
+        indexes = (
+            models.Index(
+                fields=('created_at',),
+                condition=models.Q(status='pending'),
+                name='job_pending_idx',
+            ),
+            models.Index(
+                fields=('started_at',),
+                condition=models.Q(status='running'),
+                name='job_running_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
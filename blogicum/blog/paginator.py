@@ -0,0 +1,214 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, InvalidPage, Paginator
+from django.db.models import Max, Min, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+FEED_COUNT_VERSION_KEY = 'feed_count_version'
+
+
+def get_feed_count_version():
+    version = cache.get(FEED_COUNT_VERSION_KEY)
+    if version is None:
+        cache.add(FEED_COUNT_VERSION_KEY, 1, None)
+        version = cache.get(FEED_COUNT_VERSION_KEY, 1)
+    return version
+
+
+def invalidate_feed_counts():
+    """Сбрасывает все закешированные счётчики лент."""
+    try:
+        cache.incr(FEED_COUNT_VERSION_KEY)
+    except ValueError:
+        cache.set(FEED_COUNT_VERSION_KEY, 1, None)
+
+
+def feed_count_cache_key(view, category=None, author=None, visibility=None):
+    """Ключ кеша числа постов в ленте."""
+    return (
+        f'feed_count:{get_feed_count_version()}:'
+        f'{view}:{category}:{author}:{visibility}'
+    )
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Пагинатор, который хранит общее число объектов в кеше.
+    Число приблизительное: оно живёт FEED_COUNT_CACHE_TIMEOUT секунд
+    и сбрасывается при изменении постов.
+    """
+
+    def __init__(self, *args, cache_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return super().count
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = super().count
+            cache.set(
+                self.cache_key,
+                count,
+                getattr(settings, 'FEED_COUNT_CACHE_TIMEOUT', 300)
+            )
+        return count
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор для админки.
+    Для выборки без фильтров число объектов оценивается по диапазону id
+    вместо COUNT(*) по всей таблице; с фильтрами считается точно.
+    Перенос старых постов в архив сдвигает наименьший id, и оценка
+    уменьшается. Удаления внутри диапазона её завышают, поэтому
+    страница, на которой выборка закончилась, уточняет count
+    по фактическому числу строк.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if queryset.query.where or queryset.query.distinct:
+            return super().count
+        bounds = queryset.order_by().aggregate(
+            first=Min('pk'), last=Max('pk')
+        )
+        if bounds['last'] is None:
+            return 0
+        return bounds['last'] - bounds['first'] + 1
+
+    def clamp_count(self, count):
+        self.__dict__['count'] = count
+        self.__dict__.pop('num_pages', None)
+
+    def page(self, number):
+        page = super().page(number)
+        rows = len(page)
+        if rows < self.per_page:
+            if not rows and page.number > 1:
+                self.clamp_count(super().count)
+                raise EmptyPage('На этой странице нет результатов')
+            self.clamp_count((page.number - 1) * self.per_page + rows)
+        return page
+
+
+class KeysetPage(Sequence):
+    """
+    Страница курсорной пагинации.
+    Повторяет интерфейс django.core.paginator.Page, который нужен шаблонам,
+    но не знает общего числа страниц и своего номера.
+    """
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<Keyset page>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1])
+
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(self.object_list[0])
+
+
+class KeysetPaginator:
+    """
+    Курсорная пагинация по паре (pub_date, id) от новых к старым.
+    Не выполняет COUNT(*) и OFFSET: каждая страница читается
+    по индексу от курсора.
+    """
+
+    keyset = True
+    date_field = 'pub_date'
+    descending = True
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset.order_by(*self.get_ordering())
+        self.per_page = int(per_page)
+
+    def get_ordering(self, reverse=False):
+        prefix = '-' if self.descending != reverse else ''
+        return (f'{prefix}{self.date_field}', f'{prefix}id')
+
+    def seek(self, queryset, cursor, reverse=False):
+        """Оставляет объекты, идущие после курсора в порядке выдачи."""
+        value, pk = self.decode_cursor(cursor)
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        return queryset.filter(
+            Q(**{f'{self.date_field}__{lookup}': value})
+            | Q(**{self.date_field: value, f'pk__{lookup}': pk})
+        )
+
+    def encode_cursor(self, obj):
+        value = f'{getattr(obj, self.date_field).isoformat()}|{obj.pk}'
+        return urlsafe_b64encode(value.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            value, pk = urlsafe_b64decode(
+                padded.encode()
+            ).decode().split('|')
+            value = parse_datetime(value)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise InvalidPage('Некорректный курсор страницы.')
+        if value is None:
+            raise InvalidPage('Некорректный курсор страницы.')
+        return value, pk
+
+    def page(self, after=None, before=None):
+        """Возвращает страницу после курсора after или перед before."""
+        if before:
+            rows = list(
+                self.seek(self.queryset, before, reverse=True).order_by(
+                    *self.get_ordering(reverse=True)
+                )[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return KeysetPage(rows, self, True, has_previous)
+        queryset = self.queryset
+        if after:
+            queryset = self.seek(queryset, after)
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], self, has_next, bool(after))
+
+
+class CommentKeysetPaginator(KeysetPaginator):
+    """Курсорная пагинация комментариев от старых к новым."""
+
+    date_field = 'created_at'
+    descending = False
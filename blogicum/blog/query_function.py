@@ -1,6 +1,3 @@
-from django.db.models import Count
-from django.utils import timezone
-
 from .models import Post
 
 
@@ -9,20 +6,31 @@ def get_general_queryset_posts(
         filter=True,
         annotation=True
 ):
-    """Функция производит сортировку данных по условиям фильтра."""
+    """
+    Функция производит сортировку данных по условиям фильтра.
+    Количество комментариев хранится в поле Post.comment_count,
+    поэтому агрегация по комментариям не нужна, а видимость поста —
+    в поле Post.is_visible, поэтому фильтр не зависит от текущего времени
+    и не требует соединения с категорией.
+    """
     queryset = manager.select_related(
         'author',
         'location',
         'category'
     )
     if filter:
-        queryset = queryset.filter(
-            pub_date__lte=timezone.now(),
-            is_published=True,
-            category__is_published=True,
-        )
+        queryset = queryset.filter(is_visible=True)
     if annotation:
-        queryset = queryset.annotate(
-            comment_count=Count('comments')
-        ).order_by('-pub_date')
+        queryset = queryset.order_by('-pub_date')
     return queryset
+
+
+def is_post_visible(post, user):
+    """
+    Проверяет, что пост можно показать пользователю.
+    Автор видит свои посты всегда, остальные — только опубликованные
+    посты из опубликованной категории с наступившей датой публикации.
+    """
+    if user.is_authenticated and post.author_id == user.pk:
+        return True
+    return post.is_visible
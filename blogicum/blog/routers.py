@@ -0,0 +1,146 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Приложения, чтение моделей которых можно отдавать репликам.
+# Сессии и пользователи всегда читаются с основной базы.
+REPLICA_APP_LABELS = frozenset(('blog',))
+
+# Реплики, с которых можно читать в текущем блоке replica_reads()
+_replica_reads = ContextVar('replica_reads', default=())
+_archive_reads = ContextVar('archive_reads', default=False)
+
+
+@contextmanager
+def replica_reads(since=0):
+    """
+    Внутри блока чтение моделей блога уходит на реплики, скопированные
+    с основной базы позже since (время в секундах). Если таких нет,
+    чтение остаётся на основной базе.
+    """
+    token = _replica_reads.set(fresh_replicas(since))
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def archive_reads():
+    """Внутри блока чтение моделей блога уходит в архивную базу."""
+    token = _archive_reads.set(True)
+    try:
+        yield
+    finally:
+        _archive_reads.reset(token)
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def _replica_synced_key(alias):
+    return f'replica_synced_at:{alias}'
+
+
+def mark_replica_synced(alias, moment):
+    """
+    Запоминает, что реплика содержит все записи, зафиксированные
+    в основной базе до moment (время в секундах).
+    """
+    cache.set(_replica_synced_key(alias), moment, None)
+
+
+def fresh_replicas(since=0):
+    """
+    Реплики, скопированные позже since. Реплика без отметки о копировании
+    считается устаревшей: лучше прочитать основную базу, чем старые данные.
+    """
+    replicas = get_replicas()
+    if not replicas:
+        return []
+    synced = cache.get_many([_replica_synced_key(alias) for alias in replicas])
+    return [
+        alias for alias in replicas
+        if synced.get(_replica_synced_key(alias), 0) > since
+    ]
+
+
+def get_archive():
+    return getattr(settings, 'ARCHIVE_DATABASE', None)
+
+
+def post_databases():
+    """Базы, в которых могут лежать посты: основная и архивная."""
+    archive = get_archive()
+    return ['default'] if archive is None else ['default', archive]
+
+
+class ReplicaRouter:
+    """
+    Отправляет чтение на одну из достаточно свежих реплик
+    DATABASE_REPLICAS, но только внутри replica_reads(), то есть
+    в представлениях только для чтения.
+    Запись и всё остальное чтение идут в основную базу default.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = _replica_reads.get()
+        if replicas and model._meta.app_label in REPLICA_APP_LABELS:
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Реплики получают схему и данные копированием основной базы."""
+        if db in get_replicas():
+            return False
+        return None
+
+
+class ArchiveRouter:
+    """
+    Читает из архивной базы ARCHIVE_DATABASE внутри archive_reads()
+    и всё, что связано с объектом, загруженным из архива: например,
+    комментарии архивного поста. Должен стоять в DATABASE_ROUTERS
+    перед ReplicaRouter, иначе связанные объекты искались бы на реплике.
+    """
+
+    def db_for_read(self, model, **hints):
+        archive = get_archive()
+        if archive is None or model._meta.app_label not in REPLICA_APP_LABELS:
+            return None
+        instance = hints.get('instance')
+        if _archive_reads.get() or (
+            instance is not None and instance._state.db == archive
+        ):
+            return archive
+        return None
+
+    def db_for_write(self, model, **hints):
+        """Изменения объектов из архива записываются в архив."""
+        archive = get_archive()
+        instance = hints.get('instance')
+        if archive is not None and instance is not None and (
+            instance._state.db == archive
+        ):
+            return archive
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Архив хранит копии строк с теми же ключами, что и основная база."""
+        archive = get_archive()
+        if archive is not None and archive in (obj1._state.db, obj2._state.db):
+            return True
+        return None
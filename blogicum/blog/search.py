@@ -0,0 +1,144 @@
+import re
+
+import snowballstemmer
+from django.db import connections, router
+
+from .models import Post
+
+SEARCH_TABLE = 'blog_post_search'
+# Вес совпадений в заголовке и в тексте при ранжировании bm25
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+
+WORD_RE = re.compile(r'\w+')
+CYRILLIC_RE = re.compile('[а-я]')
+STEMMERS = {
+    'russian': snowballstemmer.stemmer('russian'),
+    'english': snowballstemmer.stemmer('english'),
+}
+
+
+def stem(word):
+    """Основа слова: русские слова обрабатываются русским стеммером."""
+    word = word.lower().replace('ё', 'е')
+    language = 'russian' if CYRILLIC_RE.search(word) else 'english'
+    return STEMMERS[language].stemWord(word)
+
+
+def stem_text(text):
+    """Текст из основ слов в том виде, в каком он хранится в индексе."""
+    return ' '.join(stem(word) for word in WORD_RE.findall(text or ''))
+
+
+def match_expression(query):
+    """
+    Выражение MATCH для FTS5: все слова запроса должны встретиться,
+    каждое ищется по основе как префикс.
+    Возвращает None, если в запросе нет слов.
+    """
+    stems = [stem(word) for word in WORD_RE.findall(query or '')]
+    if not stems:
+        return None
+    return ' '.join(f'"{word}"*' for word in stems)
+
+
+def search_database():
+    """
+    База, в которой лежит индекс: та же, куда роутеры пишут посты.
+    Реплики получают индекс вместе с копией базы, архивные посты
+    в индекс не входят.
+    """
+    return router.db_for_write(Post)
+
+
+def index_posts(posts, replace=True):
+    """
+    Добавляет посты в поисковый индекс или обновляет их записи.
+    replace=False пропускает удаление старых записей, когда индекс
+    заведомо пуст.
+    """
+    rows = [
+        (post.pk, stem_text(post.title), stem_text(post.text))
+        for post in posts
+    ]
+    if not rows:
+        return
+    with connections[search_database()].cursor() as cursor:
+        if replace:
+            cursor.executemany(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+                [(pk,) for pk, _, _ in rows],
+            )
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            rows,
+        )
+
+
+def unindex_posts(post_ids):
+    """Удаляет посты из поискового индекса."""
+    with connections[search_database()].cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+            [(pk,) for pk in post_ids],
+        )
+
+
+def clear_index():
+    with connections[search_database()].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+
+
+def index_missing_posts(posts=None, batch_size=500):
+    """
+    Добавляет в индекс посты, которых в нём нет: например, созданные
+    через bulk_create, который не отправляет сигналы. Посты, изменённые
+    сырым SQL в обход ORM, обновит только команда reindex_search.
+    posts — выборка, в которой искать (по умолчанию все посты): bulk_create
+    передаёт только новые посты и не просматривает всю таблицу. Наличие
+    в индексе проверяется поиском по rowid для каждого поста.
+    Возвращает число добавленных постов.
+    """
+    if posts is None:
+        posts = Post.objects.all()
+    posts = posts.using(search_database()).only(
+        'id', 'title', 'text'
+    ).extra(where=[
+        f'NOT EXISTS (SELECT 1 FROM {SEARCH_TABLE} '
+        f'WHERE {SEARCH_TABLE}.rowid = {Post._meta.db_table}.id)'
+    ]).order_by('pk')
+    batch = []
+    total = 0
+    for post in posts.iterator(chunk_size=batch_size):
+        batch.append(post)
+        if len(batch) == batch_size:
+            index_posts(batch, replace=False)
+            total += len(batch)
+            batch = []
+    index_posts(batch, replace=False)
+    return total + len(batch)
+
+
+def search_posts(queryset, query):
+    """
+    Посты queryset, подходящие под запрос, от более релевантных к менее.
+    Индекс соединяется с выборкой постов, поэтому фильтры видимости
+    queryset применяются до ранжирования, а не после.
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return queryset.none()
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[
+            f'{SEARCH_TABLE}.rowid = {queryset.model._meta.db_table}.id',
+            f'{SEARCH_TABLE} MATCH %s',
+        ],
+        params=[expression],
+        select={
+            'search_rank': (
+                f'bm25({SEARCH_TABLE}, {TITLE_WEIGHT}, {TEXT_WEIGHT})'
+            ),
+        },
+    ).order_by('search_rank', '-pub_date')
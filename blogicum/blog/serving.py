@@ -0,0 +1,154 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpResponse,
+                         HttpResponseNotModified, StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.cache import parse_etags
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.static import was_modified_since
+
+# Имена, которые меняются вместе с содержимым: статика с хешем
+# от ManifestStaticFilesStorage и изображения с адресацией по содержимому.
+IMMUTABLE_NAME = re.compile(
+    r'(\.[0-9a-f]{12}\.\w+|/[0-9a-f]{64}(\.\w+)+)$'
+)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+RANGE_CHUNK_SIZE = 64 * 1024
+
+
+def choose_encoding(request, fullpath):
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    for encoding, extension in ENCODINGS:
+        if encoding in accepted and os.path.isfile(fullpath + extension):
+            return encoding, fullpath + extension
+    return None, fullpath
+
+
+def parse_range(header, size):
+    """Возвращает (start, end) для одного диапазона или None."""
+    match = RANGE_HEADER.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start == '':
+        start, end = max(0, size - int(end)), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        raise ValueError
+    return start, end
+
+
+def iter_range(path, start, end):
+    with open(path, 'rb') as source:
+        source.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = source.read(min(RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def serve(request, path, document_root=None):
+    """
+    Отдаёт статический файл или медиафайл для продакшн-режима:
+    заранее сжатые .br/.gz копии, ETag и Last-Modified с ответом 304,
+    запросы Range и бессрочное кеширование для имён с хешем.
+    """
+    try:
+        fullpath = safe_join(document_root, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    encoding, filepath = choose_encoding(request, fullpath)
+    stat = os.stat(filepath)
+    etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}{encoding or ""}"'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Vary': 'Accept-Encoding',
+        'Cache-Control': (
+            'public, max-age=31536000, immutable'
+            if IMMUTABLE_NAME.search(path)
+            else f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+        ),
+    }
+    if is_not_modified(request, etag, stat.st_mtime):
+        response = HttpResponseNotModified()
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    content_type = mimetypes.guess_type(fullpath)[0]
+    content_type = content_type or 'application/octet-stream'
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and if_range_matches(request, etag, stat.st_mtime):
+        response = range_response(
+            range_header, filepath, stat.st_size, content_type
+        )
+        if response is not None:
+            return finish_response(response, headers, encoding)
+
+    response = FileResponse(open(filepath, 'rb'), content_type=content_type)
+    response['Content-Length'] = str(stat.st_size)
+    return finish_response(response, headers, encoding)
+
+
+def is_not_modified(request, etag, mtime):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        return etag in parse_etags(if_none_match) or (
+            if_none_match.strip() == '*'
+        )
+    return not was_modified_since(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'), mtime
+    )
+
+
+def range_response(range_header, filepath, size, content_type):
+    """Ответ 206 или 416 на запрос Range; None, если заголовок не разобран."""
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None:
+        return None
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        iter_range(filepath, start, end),
+        status=206,
+        content_type=content_type,
+    )
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    return response
+
+
+def if_range_matches(request, etag, mtime):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    header_date = parse_http_date_safe(if_range)
+    return header_date is not None and int(mtime) <= header_date
+
+
+def finish_response(response, headers, encoding):
+    for header, value in headers.items():
+        response[header] = value
+    response['Accept-Ranges'] = 'bytes'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,253 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from .caching import (ANONYMOUS_PAGES_ALL, invalidate_anonymous_pages,
+                      invalidate_post_cards, post_page_scopes)
+from .images import has_variants, release_image
+from .models import Category, Comment, Location, Post, User
+from .paginator import invalidate_feed_counts
+from .search import index_posts, unindex_posts
+from .tasks import enqueue
+
+
+def after_commit(using, function, *args):
+    """
+    Вызывает function(*args) после фиксации транзакции, в которой
+    сработал сигнал. Иначе другой запрос успел бы закешировать старые
+    данные под уже новой версией, и сброс кеша потерялся бы.
+    """
+    transaction.on_commit(lambda: function(*args), using=using)
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, **kwargs):
+    """Увеличивает счётчик комментариев поста при создании комментария."""
+    if created and not kwargs.get('raw'):
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """
+    Уменьшает счётчик комментариев поста при удалении комментария.
+    Срабатывает и при массовом удалении из админки.
+    """
+    Post.objects.filter(
+        pk=instance.post_id,
+        comment_count__gt=0,
+    ).update(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_feed_counts(sender, using=None, **kwargs):
+    """Сбрасывает счётчики лент при публикации и снятии постов."""
+    after_commit(using, invalidate_feed_counts)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_post_card(sender, instance, using=None, **kwargs):
+    """Сбрасывает закешированную карточку изменённого поста."""
+    after_commit(using, invalidate_post_cards, [
+        (instance.pk, instance.comment_count, instance.updated_at)
+    ])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def reset_commented_post_card(sender, instance, using=None, **kwargs):
+    """Сбрасывает карточку поста, у которого изменились комментарии."""
+    after_commit(using, invalidate_post_cards, Post.objects.using(
+        using
+    ).filter(pk=instance.post_id).values_list(
+        'pk', 'comment_count', 'updated_at'
+    ))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+def reset_related_post_cards(sender, instance, using=None, **kwargs):
+    """Сбрасывает карточки постов изменённой категории или локации."""
+    after_commit(using, invalidate_post_cards, instance.posts.values_list(
+        'pk', 'comment_count', 'updated_at'
+    ))
+
+
+@receiver(post_init, sender=Post)
+def remember_post_scope(sender, instance, **kwargs):
+    """Запоминает исходные категорию и автора, чтобы сбросить и их."""
+    instance._initial_scope = (
+        instance.__dict__.get('category_id'),
+        instance.__dict__.get('author_id'),
+    )
+
+
+@receiver(post_init, sender=Post)
+def remember_post_image(sender, instance, **kwargs):
+    """Запоминает исходное изображение, чтобы заметить его замену."""
+    image = instance.__dict__.get('image')
+    instance._initial_image = getattr(image, 'name', image) or ''
+
+
+@receiver(post_save, sender=Post)
+def update_post_image_variants(
+        sender, instance, raw=False, using=None, **kwargs):
+    """
+    Ставит в очередь создание уменьшенных копий нового изображения,
+    если их ещё нет, и освобождает старое изображение. Файлы удаляются
+    только после фиксации: при откате пост остаётся со старым файлом.
+    """
+    initial_image = getattr(instance, '_initial_image', '')
+    if raw or instance.image.name == initial_image:
+        return
+    if initial_image:
+        after_commit(
+            using, release_image, initial_image, instance.image.storage
+        )
+    if instance.image and not has_variants(instance.image):
+        enqueue(
+            'generate_post_image_variants',
+            post_id=instance.pk,
+            image_name=instance.image.name,
+        )
+    instance._initial_image = instance.image.name
+
+
+@receiver(post_delete, sender=Post)
+def release_post_image(sender, instance, using=None, **kwargs):
+    """
+    Удаляет изображение удалённого поста, если оно больше не нужно,
+    после фиксации удаления.
+    """
+    if instance.image:
+        after_commit(
+            using, release_image, instance.image.name, instance.image.storage
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_post_pages(sender, instance, using=None, **kwargs):
+    """Сбрасывает страницы анонимов, где выводится изменённый пост."""
+    category_id, author_id = getattr(instance, '_initial_scope', (None, None))
+    after_commit(
+        using, invalidate_anonymous_pages,
+        f'post:{instance.pk}', *post_page_scopes(
+            category_ids={category_id, instance.category_id} - {None},
+            author_ids={author_id, instance.author_id} - {None},
+        ),
+    )
+    instance._initial_scope = (instance.category_id, instance.author_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def reset_commented_post_pages(sender, instance, using=None, **kwargs):
+    """Сбрасывает страницы анонимов, где выводится счётчик комментариев."""
+    post = Post.objects.filter(pk=instance.post_id).values(
+        'category_id', 'author_id'
+    ).first()
+    if post is None:
+        return
+    after_commit(
+        using, invalidate_anonymous_pages,
+        f'post:{instance.post_id}', *post_page_scopes(
+            category_ids=[post['category_id']],
+            author_ids=[post['author_id']],
+        ),
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def reset_all_anonymous_pages(sender, using=None, **kwargs):
+    """Категории и локации выводятся во всех лентах: сбрасываем все."""
+    after_commit(using, invalidate_anonymous_pages, ANONYMOUS_PAGES_ALL)
+
+
+@receiver(post_init, sender=User)
+def remember_user_names(sender, instance, **kwargs):
+    """Запоминает имена пользователя, которые выводятся на страницах."""
+    instance._initial_names = (
+        instance.__dict__.get('username'),
+        instance.__dict__.get('first_name'),
+        instance.__dict__.get('last_name'),
+    )
+
+
+@receiver(post_save, sender=User)
+def reset_user_post_cards(sender, instance, created, using=None, **kwargs):
+    """Сбрасывает карточки постов автора: в них выводится его логин."""
+    username = getattr(instance, '_initial_names', (None,))[0]
+    if not created and username != instance.username:
+        after_commit(using, invalidate_post_cards, instance.posts.values_list(
+            'pk', 'comment_count', 'updated_at'
+        ))
+
+
+@receiver(post_save, sender=User)
+def reset_user_pages(sender, instance, created, using=None, **kwargs):
+    """
+    Сбрасывает страницы анонимов при смене имён пользователя.
+    Логин автора выводится во всех лентах и на страницах постов,
+    полное имя — только в профиле. Вход на сайт меняет лишь last_login
+    и страниц не сбрасывает.
+    """
+    username, *names = getattr(instance, '_initial_names', (None,))
+    if not created and username != instance.username:
+        after_commit(
+            using, invalidate_anonymous_pages, ANONYMOUS_PAGES_ALL,
+            f'profile:{username}', f'profile:{instance.username}',
+        )
+    elif not created and names != [instance.first_name, instance.last_name]:
+        after_commit(
+            using, invalidate_anonymous_pages, f'profile:{instance.username}'
+        )
+    instance._initial_names = (
+        instance.username, instance.first_name, instance.last_name
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_post_search_index(sender, instance, update_fields=None, **kwargs):
+    """Обновляет запись поста в поисковом индексе при смене текста."""
+    if update_fields is None or {'title', 'text'} & set(update_fields):
+        index_posts([instance])
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_search_index(sender, instance, **kwargs):
+    """Удаляет удалённый пост из поискового индекса."""
+    unindex_posts([instance.pk])
+
+
+@receiver(post_init, sender=Category)
+def remember_category_published(sender, instance, **kwargs):
+    """Запоминает исходный флаг публикации категории."""
+    instance._initial_is_published = instance.__dict__.get('is_published')
+
+
+@receiver(post_save, sender=Category)
+def sync_category_posts_visibility(sender, instance, created, **kwargs):
+    """Пересчитывает видимость постов при публикации или снятии категории."""
+    if not created and (
+        instance.is_published != instance._initial_is_published
+    ):
+        instance.posts.sync_visibility()
+    instance._initial_is_published = instance.is_published
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    """Скрывает посты удаляемой категории: у них не останется категории."""
+    instance.posts.filter(is_visible=True).update(is_visible=False)
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite для нескольких процессов-обработчиков.
+    Каждое новое соединение получает PRAGMA из настройки SQLITE_PRAGMAS
+    (WAL, synchronous, mmap, размер кеша, ожидание блокировки).
+    Пока immediate_transactions включён, транзакции начинаются
+    с BEGIN IMMEDIATE: блокировка на запись берётся сразу, и соединение
+    не упирается в «database is locked» при повышении блокировки
+    с чтения до записи посреди транзакции.
+    """
+
+    immediate_transactions = False
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.immediate_transactions:
+            self.cursor().execute('BEGIN IMMEDIATE')
+        else:
+            super()._start_transaction_under_autocommit()
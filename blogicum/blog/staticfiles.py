@@ -0,0 +1,56 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.txt', '.html', '.json', '.xml', '.ico',
+)
+MIN_COMPRESS_SIZE = 256
+MAX_COMPRESSED_RATIO = 0.95
+
+
+def compress_file(path):
+    """
+    Создаёт рядом с файлом сжатые копии .gz и .br (если установлен
+    пакет brotli). Копия не создаётся, если выигрыш меньше 5%.
+    Возвращает список созданных файлов.
+    """
+    with open(path, 'rb') as source:
+        data = source.read()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return []
+    variants = [('.gz', lambda raw: gzip.compress(raw, 9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress))
+    created = []
+    for extension, compress in variants:
+        compressed = compress(data)
+        if len(compressed) > len(data) * MAX_COMPRESSED_RATIO:
+            continue
+        with open(path + extension, 'wb') as target:
+            target.write(compressed)
+        created.append(path + extension)
+    return created
+
+
+class PrecompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Хранилище статики с хешем содержимого в имени файла.
+    После collectstatic дополнительно сжимает текстовые файлы,
+    чтобы сервер отдавал готовые .gz и .br без сжатия на лету.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in self.hashed_files.values():
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                for path in compress_file(self.path(name)):
+                    yield name, os.path.basename(path), True
@@ -0,0 +1,146 @@
+import traceback
+
+from datetime import timedelta
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+TASKS = {}
+
+
+def task(function):
+    """Регистрирует функцию как фоновую задачу под её именем."""
+    TASKS[function.__name__] = function
+    return function
+
+
+def enqueue(name, **kwargs):
+    """
+    Ставит задачу в очередь. Задача сохраняется в той же транзакции,
+    что и изменения, которые её вызвали. С BACKGROUND_TASKS_EAGER = True
+    задача выполняется сразу.
+    """
+    if name not in TASKS:
+        raise KeyError(f'Неизвестная фоновая задача: {name}')
+    job = Job.objects.create(name=name, kwargs=kwargs)
+    if getattr(settings, 'BACKGROUND_TASKS_EAGER', False):
+        finish_job(job, *execute(job.name, job.kwargs))
+    return job
+
+
+def requeue_stale_jobs(now=None):
+    """
+    Возвращает в очередь задачи, которые выполняются дольше
+    BACKGROUND_TASKS_TIMEOUT секунд: их обработчик, скорее всего,
+    упал или был остановлен. Зависшая попытка засчитывается, после
+    BACKGROUND_TASKS_MAX_ATTEMPTS попыток задача помечается ошибочной.
+    Возвращает число найденных задач.
+    """
+    now = now or timezone.now()
+    timeout = settings.BACKGROUND_TASKS_TIMEOUT
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        started_at__lt=now - timedelta(seconds=timeout),
+    )
+    changes = {
+        'attempts': F('attempts') + 1,
+        'error': f'Задача не завершилась за {timeout} с.',
+        'finished_at': now,
+    }
+    failed = stale.filter(
+        attempts__gte=settings.BACKGROUND_TASKS_MAX_ATTEMPTS - 1
+    ).update(status=Job.FAILED, **changes)
+    return failed + stale.update(status=Job.PENDING, **changes)
+
+
+def claim_jobs(limit):
+    """
+    Забирает из очереди до limit задач, помечая их выполняемыми.
+    Сначала возвращает в очередь зависшие задачи.
+    """
+    requeue_stale_jobs()
+    claimed = []
+    candidates = Job.objects.filter(status=Job.PENDING).order_by(
+        'created_at'
+    ).values_list('pk', flat=True)[:limit]
+    for pk in candidates:
+        updated = Job.objects.filter(pk=pk, status=Job.PENDING).update(
+            status=Job.RUNNING, started_at=timezone.now()
+        )
+        if updated:
+            claimed.append(Job.objects.get(pk=pk))
+    return claimed
+
+
+def init_worker_process():
+    """Готовит Django в дочернем процессе пула."""
+    if not apps.ready:
+        django.setup()
+
+
+def execute(name, kwargs):
+    """Выполняет задачу. Возвращает пару (успех, текст ошибки)."""
+    try:
+        TASKS[name](**kwargs)
+    except Exception:
+        return False, traceback.format_exc()
+    return True, ''
+
+
+def finish_job(job, succeeded, error):
+    job.attempts += 1
+    job.error = error
+    if succeeded:
+        job.status = Job.DONE
+    elif job.attempts < settings.BACKGROUND_TASKS_MAX_ATTEMPTS:
+        job.status = Job.PENDING
+    else:
+        job.status = Job.FAILED
+    job.finished_at = timezone.now()
+    job.save(update_fields=('attempts', 'error', 'status', 'finished_at'))
+
+
+def run_pending_jobs(limit=100, executor=None):
+    """
+    Выполняет задачи из очереди: в пуле процессов executor
+    или в текущем процессе, если пул не передан.
+    Возвращает число обработанных задач.
+    """
+    jobs = claim_jobs(limit)
+    if executor is None:
+        for job in jobs:
+            finish_job(job, *execute(job.name, job.kwargs))
+        return len(jobs)
+    futures = [
+        (job, executor.submit(execute, job.name, job.kwargs))
+        for job in jobs
+    ]
+    for job, future in futures:
+        try:
+            finish_job(job, *future.result())
+        except Exception:
+            finish_job(job, False, traceback.format_exc())
+    return len(jobs)
+
+
+@task
+def generate_post_image_variants(post_id, image_name):
+    """
+    Создаёт уменьшенные копии изображения поста.
+    Сохранение поста после этого сбрасывает кеши страниц с ним.
+    """
+    from .images import generate_variants, has_variants
+    from .models import Post
+
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or post.image.name != image_name:
+        return
+    if has_variants(post.image):
+        return
+    generate_variants(post.image)
+    post.save(update_fields=('image',))
@@ -0,0 +1,24 @@
+from django import template
+from django.conf import settings
+
+from ..images import image_srcsets
+
+register = template.Library()
+
+
+@register.filter
+def is_author(user, post):
+    """Проверяет, что пользователь — автор поста, без запроса к User."""
+    return user.is_authenticated and user.pk == post.author_id
+
+
+@register.simple_tag
+def post_card_timeout():
+    """Время жизни закешированной карточки поста, секунды."""
+    return settings.POST_CARD_CACHE_TIMEOUT
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(image, sizes):
+    """Изображение поста с уменьшенными копиями в srcset."""
+    return {'image': image, 'sizes': sizes, 'srcsets': image_srcsets(image)}
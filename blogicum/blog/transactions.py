@@ -0,0 +1,50 @@
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db import transaction
+
+LOCKED_ERRORS = ('database is locked', 'database table is locked')
+
+
+def is_locked_error(error):
+    return any(message in str(error) for message in LOCKED_ERRORS)
+
+
+def serialized_write(function=None, *, using=DEFAULT_DB_ALIAS):
+    """
+    Выполняет function в транзакции, которая сразу берёт блокировку
+    на запись (BEGIN IMMEDIATE для SQLite), так что пишущие процессы
+    выстраиваются в очередь на busy_timeout, а не мешают друг другу.
+    Если блокировку не удалось получить, транзакция повторяется
+    SQLITE_WRITE_RETRIES раз с экспоненциальной паузой и случайным
+    разбросом от SQLITE_WRITE_BACKOFF секунд.
+    """
+    if function is None:
+        return lambda function: serialized_write(function, using=using)
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        connection = connections[using]
+        retries = getattr(settings, 'SQLITE_WRITE_RETRIES', 0)
+        backoff = getattr(settings, 'SQLITE_WRITE_BACKOFF', 0.05)
+        for attempt in range(retries + 1):
+            previous = getattr(connection, 'immediate_transactions', False)
+            connection.immediate_transactions = True
+            try:
+                with transaction.atomic(using=using):
+                    return function(*args, **kwargs)
+            except OperationalError as error:
+                if (
+                    not is_locked_error(error)
+                    or attempt == retries
+                    or connection.in_atomic_block
+                ):
+                    raise
+            finally:
+                connection.immediate_transactions = previous
+            time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    return wrapper
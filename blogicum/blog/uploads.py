@@ -0,0 +1,100 @@
+import logging
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, UnidentifiedImageError
+
+try:
+    import resource
+except ImportError:
+    # Модуля resource нет в Windows: пиковая память там не замеряется
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+HEADER_PROBE_LIMIT = 256 * 1024
+
+
+def peak_memory():
+    """Пиковая память процесса в КБ или 0, если её нельзя узнать."""
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class LimitedImageUploadHandler(FileUploadHandler):
+    """
+    Первый обработчик загрузок в формах постов (его ставит
+    UploadErrorsMixin): пропускает данные дальше по цепочке,
+    считая байты, и по заголовку изображения узнаёт его размеры.
+    Файл отбрасывается, как только превышен POST_IMAGE_MAX_BYTES
+    или POST_IMAGE_MAX_PIXELS, — до полной записи и декодирования.
+    Причина отказа сохраняется в request.upload_errors.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.received = 0
+        self.header = BytesIO()
+        self.dimensions = None
+        self.started = time.perf_counter()
+        self.max_rss = peak_memory()
+
+    def reject(self, message):
+        errors = getattr(self.request, 'upload_errors', {})
+        errors[self.field_name] = message
+        self.request.upload_errors = errors
+        logger.warning(
+            'Загрузка %s отклонена: %s', self.file_name, message
+        )
+        raise SkipFile(message)
+
+    def probe_dimensions(self, raw_data):
+        self.header.write(raw_data)
+        try:
+            image = Image.open(BytesIO(self.header.getvalue()))
+            self.dimensions = image.size
+        except Image.DecompressionBombError:
+            # Pillow сам отказывается открывать заголовок с размерами
+            # больше удвоенного MAX_IMAGE_PIXELS
+            self.reject(
+                'Изображение слишком большое: допускается не более '
+                f'{settings.POST_IMAGE_MAX_PIXELS} пикселей.'
+            )
+        except (UnidentifiedImageError, OSError, SyntaxError):
+            if self.header.tell() >= HEADER_PROBE_LIMIT:
+                self.dimensions = (0, 0)
+            return
+        width, height = self.dimensions
+        if width * height > settings.POST_IMAGE_MAX_PIXELS:
+            self.reject(
+                f'Изображение {width}×{height} слишком большое: '
+                f'допускается не более {settings.POST_IMAGE_MAX_PIXELS} '
+                'пикселей.'
+            )
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.POST_IMAGE_MAX_BYTES:
+            self.reject(
+                'Файл слишком большой: допускается не более '
+                f'{filesizeformat(settings.POST_IMAGE_MAX_BYTES)}.'
+            )
+        if self.dimensions is None:
+            self.probe_dimensions(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        max_rss = peak_memory()
+        logger.info(
+            'Загрузка %s: %d байт, %.1f мс, прирост пиковой памяти '
+            'процесса %d КБ',
+            self.file_name,
+            self.received,
+            (time.perf_counter() - self.started) * 1000,
+            max_rss - self.max_rss,
+        )
+        return None
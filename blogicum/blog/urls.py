@@ -1,6 +1,6 @@
 from django.urls import include, path
 
-from . import views
+from . import feeds, views
 
 app_name = 'Blog'
 
@@ -12,6 +12,8 @@ post_urls = [
          name='edit_post'),
     path('<int:post_id>/delete/', views.PostDeleteView.as_view(),
          name='delete_post'),
+    path('<int:post_id>/comments/', views.CommentListView.as_view(),
+         name='comments'),
     path('<int:post_id>/comment/', views.CommentCreateView.as_view(),
          name='add_comment'),
     path('<int:post_id>/edit_comment/<int:comment_id>/',
@@ -23,13 +25,24 @@ post_urls = [
 
 urlpatterns = [
     path('', views.IndexListView.as_view(), name='index'),
+    path('search/', views.SearchListView.as_view(), name='search'),
+    path('rss/', feeds.PostsFeed(), name='feed'),
+    path('atom/', feeds.AtomPostsFeed(), name='feed_atom'),
     path('posts/', include(post_urls)),
 
     path('category/<slug:category_slug>/', views.CategoryListView.as_view(),
          name='category_posts'),
+    path('category/<slug:category_slug>/rss/', feeds.CategoryPostsFeed(),
+         name='category_feed'),
+    path('category/<slug:category_slug>/atom/',
+         feeds.AtomCategoryPostsFeed(), name='category_feed_atom'),
 
     path('profile/<str:username>/', views.ProfileListView.as_view(),
          name='profile'),
+    path('profile/<str:username>/rss/', feeds.ProfilePostsFeed(),
+         name='profile_feed'),
+    path('profile/<str:username>/atom/', feeds.AtomProfilePostsFeed(),
+         name='profile_feed_atom'),
     path('profile_edit/', views.ProfileUpdateView.as_view(),
          name='edit_profile'),
 ]
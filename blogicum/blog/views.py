@@ -1,30 +1,49 @@
 from django.conf import settings
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.paginator import InvalidPage
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
+from django.utils.http import urlencode
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
                                   UpdateView)
 
+from .archive import is_archived
 from .forms import CommentForm, PostForm
-from .mixin import (CommentMixin, CommentUpdateDeleteMixin, EditContentMixin,
-                    PostMixin)
+from .mixin import (AnonymousPageCacheMixin, ArchiveFeedMixin,
+                    CachedCountMixin, CommentMixin,
+                    CommentUpdateDeleteMixin, ConditionalGetMixin,
+                    EditContentMixin, KeysetPaginationMixin, PostMixin,
+                    ReplicaReadMixin, RequestCacheMixin,
+                    SerializedWriteMixin, UploadErrorsMixin)
 from .models import Category, Post, User
-from .query_function import get_general_queryset_posts
+from .paginator import CommentKeysetPaginator
+from .query_function import get_general_queryset_posts, is_post_visible
+from .routers import archive_reads, get_archive
+from .search import search_posts
 
 
-class IndexListView(PostMixin, ListView):
+class IndexListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, ReplicaReadMixin,
+    ArchiveFeedMixin, KeysetPaginationMixin, CachedCountMixin, PostMixin,
+    ListView
+):
     """CBV главной страницы. Выводит список постов"""
 
     paginate_by = settings.PUBLIC_ON_THE_PAGE
 
+    def get_count_cache_parts(self):
+        return {'view': 'index', 'visibility': 'public'}
+
     def get_queryset(self):
         return get_general_queryset_posts()
 
 
-class PostCreateView(LoginRequiredMixin, PostMixin, CreateView):
+class PostCreateView(
+    LoginRequiredMixin, UploadErrorsMixin, SerializedWriteMixin, PostMixin,
+    CreateView
+):
     """CBV страница создания поста"""
 
     paginate_by = settings.PUBLIC_ON_THE_PAGE
@@ -41,11 +60,16 @@ class PostCreateView(LoginRequiredMixin, PostMixin, CreateView):
         )
 
 
-class PostDetailView(PostMixin, DetailView):
+class PostDetailView(
+    ConditionalGetMixin, ReplicaReadMixin, PostMixin, DetailView
+):
     """CBV страница поста с комментариями к нему"""
 
     template_name = 'blog/detail.html'
 
+    def get_validator_scopes(self):
+        return [f'post:{self.kwargs["post_id"]}']
+
     def get_queryset(self):
         queryset = get_general_queryset_posts(
             manager=Post.objects,
@@ -53,26 +77,57 @@ class PostDetailView(PostMixin, DetailView):
             annotation=False)
         return queryset
 
+    comments_cursor_param = 'comments_after'
+
     def get_object(self, queryset=None):
-        post = super().get_object(queryset)
-        if post.author != self.request.user and (
-                post.is_published is False
-                or post.category.is_published is False
-                or post.pub_date > timezone.now()
-        ):
+        try:
+            post = super().get_object(queryset)
+        except Http404:
+            post = self.get_archived_object(queryset)
+        if not is_post_visible(post, self.request.user):
             raise Http404
         return post
 
+    def get_archived_object(self, queryset=None):
+        """
+        Ищет пост в архивной базе. Комментарии архивного поста
+        роутер затем тоже читает из архива.
+        """
+        if get_archive() is None:
+            raise Http404
+        with archive_reads():
+            return super().get_object(queryset)
+
+    def get_comments_page(self):
+        paginator = CommentKeysetPaginator(
+            self.object.comments.select_related('author'),
+            settings.COMMENTS_ON_THE_PAGE,
+        )
+        try:
+            return paginator.page(
+                after=self.request.GET.get(self.comments_cursor_param)
+            )
+        except InvalidPage as error:
+            raise Http404(str(error))
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related(
-            'author'
-        )
+        context['comments'] = self.get_comments_page()
+        context['archived'] = is_archived(self.object)
         return context
 
 
-class PostUpdateView(EditContentMixin, PostMixin, UpdateView):
+class CommentListView(PostDetailView):
+    """CBV фрагмент страницы поста со следующей порцией комментариев"""
+
+    template_name = 'includes/comment_list.html'
+    comments_cursor_param = 'after'
+
+
+class PostUpdateView(
+    EditContentMixin, UploadErrorsMixin, PostMixin, UpdateView
+):
     """CBV страница редактирования поста"""
 
     paginate_by = settings.PUBLIC_ON_THE_PAGE
@@ -102,19 +157,33 @@ class PostDeleteView(EditContentMixin, PostMixin, DeleteView):
         )
 
 
-class CategoryListView(ListView):
+class CategoryListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, ReplicaReadMixin,
+    RequestCacheMixin, ArchiveFeedMixin, KeysetPaginationMixin,
+    CachedCountMixin, ListView
+):
     """CBV страница категории. Выводит список постов в категории."""
 
     model = Category
     paginate_by = settings.PUBLIC_ON_THE_PAGE
     template_name = 'blog/category.html'
 
+    def get_page_cache_scope(self):
+        return f'category:{self.kwargs["category_slug"]}'
+
+    def get_count_cache_parts(self):
+        return {
+            'view': 'category',
+            'category': self.kwargs['category_slug'],
+            'visibility': 'public',
+        }
+
     def category(self):
-        return get_object_or_404(
+        return self.get_cached('category', lambda: get_object_or_404(
             Category,
             slug=self.kwargs['category_slug'],
             is_published=True,
-        )
+        ))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -126,7 +195,30 @@ class CategoryListView(ListView):
         return get_general_queryset_posts(manager=category.posts)
 
 
-class CommentCreateView(LoginRequiredMixin, CommentMixin, CreateView):
+class SearchListView(PostMixin, ListView):
+    """CBV страница поиска по опубликованным постам"""
+
+    paginate_by = settings.PUBLIC_ON_THE_PAGE
+    template_name = 'blog/search.html'
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return search_posts(
+            get_general_queryset_posts(annotation=False), self.get_query()
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_query()
+        context['page_query'] = urlencode({'q': context['query']}) + '&'
+        return context
+
+
+class CommentCreateView(
+    LoginRequiredMixin, SerializedWriteMixin, CommentMixin, CreateView
+):
     """CBV класс для создания комментария"""
 
     def get_success_url(self):
@@ -152,14 +244,34 @@ class CommentDeleteView(CommentUpdateDeleteMixin, CommentMixin, DeleteView):
     """CBV класс для удаления комментария"""
 
 
-class ProfileListView(ListView):
+class ProfileListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, ReplicaReadMixin,
+    RequestCacheMixin, ArchiveFeedMixin, KeysetPaginationMixin,
+    CachedCountMixin, ListView
+):
     """CBV страница пользователя с публикациями"""
 
     paginate_by = settings.PUBLIC_ON_THE_PAGE
     template_name = 'blog/profile.html'
 
+    def get_page_cache_scope(self):
+        return f'profile:{self.kwargs.get("username")}'
+
+    def get_count_cache_parts(self):
+        username = self.kwargs.get('username')
+        return {
+            'view': 'profile',
+            'author': username,
+            'visibility': (
+                'own' if self.request.user.get_username() == username
+                else 'public'
+            ),
+        }
+
     def get_autor(self):
-        return get_object_or_404(User, username=self.kwargs.get('username'))
+        return self.get_cached('author', lambda: get_object_or_404(
+            User, username=self.kwargs.get('username')
+        ))
 
     def get_queryset(self):
         author = self.get_autor()
@@ -55,6 +55,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'blog.middleware.ReplicaStickinessMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -85,11 +86,76 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'blog.sqlite_backend',
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
 
+# PRAGMA для каждого соединения с SQLite: WAL позволяет читать во время
+# записи, busy_timeout (мс) — ждать блокировку вместо ошибки
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+}
+
+# Повторы записи при «database is locked» и начальная пауза, секунды
+SQLITE_WRITE_RETRIES = 5
+SQLITE_WRITE_BACKOFF = 0.05
+
+# Реплики для чтения лент и страниц постов. Например, добавьте в DATABASES
+# 'replica': {'ENGINE': 'blog.sqlite_backend', 'NAME': BASE_DIR / 'replica.sqlite3'}
+# и укажите DATABASE_REPLICAS = ['replica']; SQLite-реплики обновляет
+# команда sync_replicas. Реплика читается, только если отмечена
+# blog.routers.mark_replica_synced, это делает sync_replicas
+DATABASE_ROUTERS = ['blog.routers.ArchiveRouter', 'blog.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+
+# Сколько секунд помнить время последней записи пользователя: не меньше
+# наибольшего отставания реплик (sync_replicas по расписанию). Пока
+# реплики не скопированы позже записи, он читает основную базу
+REPLICA_STICKY_SECONDS = 10 * 60
+
+# Архив старых постов с комментариями. Добавьте в DATABASES, например,
+# 'archive': {'ENGINE': 'blog.sqlite_backend', 'NAME': BASE_DIR / 'archive.sqlite3'},
+# создайте схему (migrate --database archive) и укажите
+# ARCHIVE_DATABASE = 'archive'; посты переносит команда archive_posts
+ARCHIVE_DATABASE = None
+
+# Посты старше стольких дней переносятся в архив, пачками по ARCHIVE_BATCH_SIZE
+ARCHIVE_HORIZON_DAYS = 365 * 2
+ARCHIVE_BATCH_SIZE = 500
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# Кеш общий для всех процессов: версии страниц и счётчики лент
+# сбрасывают не только веб-процессы, но и publish_scheduled, run_worker
+# и archive_posts. Кеш в памяти процесса (LocMemCache) этих сбросов
+# не увидит. Вместо файлов можно указать Memcached или Redis.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'default',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'post_cards': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'post_cards',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+POST_CARD_CACHE_ALIAS = 'post_cards'
+
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Страницы лент для анонимов; сбрасываются сигналами
+ANONYMOUS_PAGE_CACHE_TIMEOUT = 60 * 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -133,6 +199,18 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static_dev'
 ]
 
+STATIC_ROOT = BASE_DIR / 'static'
+
+# Продакшн-режим отдачи файлов: статика с хешем в имени и заранее
+# сжатыми копиями (после collectstatic), ETag/Last-Modified, Range
+# и бессрочное кеширование неизменяемых файлов.
+STATIC_PRODUCTION_MODE = False
+
+if STATIC_PRODUCTION_MODE:
+    STATICFILES_STORAGE = (
+        'blog.staticfiles.PrecompressedManifestStaticFilesStorage'
+    )
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -143,6 +221,18 @@ INTERNAL_IPS = [
 
 PUBLIC_ON_THE_PAGE = 10
 
+COMMENTS_ON_THE_PAGE = 20
+
+# Курсорная пагинация лент без COUNT(*) и OFFSET
+KEYSET_PAGINATION = False
+
+# Время жизни закешированного числа постов в ленте, секунды
+FEED_COUNT_CACHE_TIMEOUT = 300
+
+# Число записей в RSS/Atom-лентах и время жизни закешированной записи
+FEED_ITEMS = 20
+FEED_ENTRY_CACHE_TIMEOUT = 60 * 60 * 24
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
@@ -153,3 +243,34 @@ LOGIN_URL = 'login'
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 MEDIA_ROOT = BASE_DIR / 'media'
+
+MEDIA_URL = '/media/'
+
+# Срок кеширования медиафайлов, имя которых не содержит хеша, секунды
+MEDIA_CACHE_MAX_AGE = 60 * 60
+
+# Уменьшенные копии изображений постов: имя копии -> ширина в пикселях.
+# Первая копия используется как src по умолчанию.
+POST_IMAGE_VARIANTS = {
+    'card': 640,
+    'detail': 1280,
+}
+
+POST_IMAGE_QUALITY = 80
+
+# Ограничения загрузки изображений постов: проверяются по мере приёма
+# файла обработчиком blog.uploads.LimitedImageUploadHandler, который
+# подключают формы создания и редактирования постов
+POST_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+
+POST_IMAGE_MAX_PIXELS = 40_000_000
+
+# Фоновые задачи выполняет команда run_worker.
+# С BACKGROUND_TASKS_EAGER = True задачи выполняются сразу, без очереди.
+BACKGROUND_TASKS_EAGER = False
+
+BACKGROUND_TASKS_MAX_ATTEMPTS = 3
+
+# Задача, которая выполняется дольше стольких секунд, считается брошенной
+# упавшим обработчиком и возвращается в очередь
+BACKGROUND_TASKS_TIMEOUT = 10 * 60
@@ -1,9 +1,10 @@
 """blogicum URL Configuration"""
+from blog.serving import serve
 from blog.views import ProfileCreateView
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
@@ -16,7 +17,25 @@ urlpatterns = [
     path('auth/registration/', ProfileCreateView.as_view(),
          name='registration'
          ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+if settings.STATIC_PRODUCTION_MODE:
+    urlpatterns += [
+        re_path(
+            rf'^{settings.STATIC_URL.lstrip("/")}(?P<path>.*)$',
+            serve,
+            {'document_root': settings.STATIC_ROOT},
+        ),
+        re_path(
+            rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.*)$',
+            serve,
+            {'document_root': settings.MEDIA_ROOT},
+        ),
+    ]
+else:
+    urlpatterns += static(
+        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
+    )
 
 
 if settings.DEBUG:
@@ -0,0 +1,164 @@
+"""Бенчмарк всех страниц blog.urls и pages.urls.
+
+Запуск (файл не собирается обычным прогоном тестов):
+
+    BENCH_POSTS=5000 BENCH_OUTPUT=bench.json pytest tests/bench_endpoints.py
+
+Размер данных и число повторов задаются переменными окружения
+BENCH_USERS, BENCH_CATEGORIES, BENCH_LOCATIONS, BENCH_POSTS,
+BENCH_COMMENTS и BENCH_REPEAT. Результат — JSON со временем p50/p95,
+числом SQL-запросов и прочитанных строк для каждой страницы.
+"""
+import json
+import math
+import os
+import random
+import time
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+from django.utils import timezone
+
+from blog.management.commands.recount_comments import recount_comments
+from blog.models import Comment, Post
+
+SIZES = {
+    "users": int(os.environ.get("BENCH_USERS", 20)),
+    "categories": int(os.environ.get("BENCH_CATEGORIES", 10)),
+    "locations": int(os.environ.get("BENCH_LOCATIONS", 10)),
+    "posts": int(os.environ.get("BENCH_POSTS", 1000)),
+    "comments": int(os.environ.get("BENCH_COMMENTS", 5000)),
+}
+REPEAT = int(os.environ.get("BENCH_REPEAT", 20))
+OUTPUT = os.environ.get("BENCH_OUTPUT", "bench_output.json")
+BATCH_SIZE = 1000
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    rank = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def iter_url_names(patterns, namespace):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_url_names(pattern.url_patterns, namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield (
+                f"{namespace}:{pattern.name}",
+                list(pattern.pattern.converters),
+            )
+
+
+def count_rows(queries):
+    rows = 0
+    with connection.cursor() as cursor:
+        for query in queries:
+            sql = query["sql"]
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            cursor.execute(f"SELECT COUNT(*) FROM ({sql})")
+            rows += cursor.fetchone()[0]
+    return rows
+
+
+@pytest.fixture
+def dataset(mixer, user):
+    users = [user] + mixer.cycle(SIZES["users"] - 1).blend("auth.User")
+    categories = mixer.cycle(SIZES["categories"]).blend(
+        "blog.Category", is_published=True
+    )
+    locations = mixer.cycle(SIZES["locations"]).blend(
+        "blog.Location", is_published=True
+    )
+    now = timezone.now()
+    with mixer.ctx(commit=False):
+        posts = mixer.cycle(SIZES["posts"]).blend(
+            "blog.Post",
+            is_published=True,
+            is_visible=True,
+            author=(random.choice(users) for _ in range(SIZES["posts"])),
+            category=(
+                random.choice(categories) for _ in range(SIZES["posts"])
+            ),
+            location=(
+                random.choice(locations) for _ in range(SIZES["posts"])
+            ),
+            pub_date=(
+                now - timedelta(minutes=i) for i in range(SIZES["posts"])
+            ),
+        )
+    Post.objects.bulk_create(posts, batch_size=BATCH_SIZE)
+    posts = list(Post.objects.select_related("category"))
+    own_post = next(post for post in posts if post.author_id == user.id)
+    with mixer.ctx(commit=False):
+        comments = mixer.cycle(SIZES["comments"]).blend(
+            "blog.Comment",
+            post=(
+                own_post if i % 10 == 0 else random.choice(posts)
+                for i in range(SIZES["comments"])
+            ),
+            author=(random.choice(users) for _ in range(SIZES["comments"])),
+        )
+    Comment.objects.bulk_create(comments, batch_size=BATCH_SIZE)
+    recount_comments()
+    return {
+        "post_id": own_post.id,
+        "comment_id": Comment.objects.filter(
+            post=own_post, author=user
+        ).values_list("id", flat=True).first(),
+        "category_slug": own_post.category.slug,
+        "username": user.username,
+    }
+
+
+def measure(client, url):
+    timings = []
+    queries = None
+    status = None
+    for _ in range(REPEAT):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+        status = response.status_code
+        if queries is None:
+            queries = list(captured.captured_queries)
+    return {
+        "status": status,
+        "cold_ms": round(timings[0], 2),
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "queries": len(queries),
+        "rows": count_rows(queries),
+    }
+
+
+@pytest.mark.django_db
+def test_benchmark_endpoints(dataset, client, user_client, user):
+    from blog import urls as blog_urls
+    from pages import urls as pages_urls
+
+    if dataset["comment_id"] is None:
+        dataset["comment_id"] = Comment.objects.create(
+            post_id=dataset["post_id"], author=user, text="Комментарий"
+        ).id
+    endpoints = list(iter_url_names(blog_urls.urlpatterns, "blog"))
+    endpoints += list(iter_url_names(pages_urls.urlpatterns, "pages"))
+    results = {}
+    for name, kwarg_names in endpoints:
+        url = reverse(
+            name, kwargs={kwarg: dataset[kwarg] for kwarg in kwarg_names}
+        )
+        results[name] = {
+            "url": url,
+            "anonymous": measure(client, url),
+            "author": measure(user_client, url),
+        }
+    report = {"sizes": SIZES, "repeat": REPEAT, "endpoints": results}
+    with open(OUTPUT, "w", encoding="utf-8") as output:
+        json.dump(report, output, ensure_ascii=False, indent=2)
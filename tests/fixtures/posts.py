@@ -21,6 +21,30 @@ from conftest import (
 )
 
 
+@pytest.fixture
+def make_post(mixer: Mixer, user, published_category):
+    """Создаёт видимые посты, опубликованные вчера; поля можно задать."""
+    def make(title=None, text=None, **fields):
+        fields = {
+            "author": user,
+            "category": published_category,
+            "is_published": True,
+            "pub_date": timezone.now() - timedelta(days=1),
+            **fields,
+        }
+        if title is not None:
+            fields["title"] = title
+        if text is not None:
+            fields["text"] = text
+        return mixer.blend("blog.Post", **fields)
+    return make
+
+
+@pytest.fixture
+def public_post(make_post):
+    return make_post()
+
+
 @pytest.fixture
 def posts_with_unpublished_category(mixer: Mixer, user: Model):
     return mixer.cycle(N_PER_FIXTURE).blend(
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+import pytest
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post
+from blog.paginator import EstimatedCountPaginator
+
+
+@pytest.fixture
+def many_posts(mixer, user, published_category, published_location):
+    return mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, text=mixer.sequence("ж" * 500 + "{0}"),
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+@pytest.fixture
+def many_comments(mixer, user, many_posts):
+    return mixer.cycle(5).blend(
+        "blog.Comment", post=many_posts[0], author=user,
+        text=mixer.sequence("ж" * 500 + "{0}"),
+    )
+
+
+def changelist_queries(admin_client, url):
+    admin_client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(url)
+    assert response.status_code == 200
+    return response, len(queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("url", "objects"),
+    [
+        ("/admin/blog/post/", "many_posts"),
+        ("/admin/blog/comment/", "many_comments"),
+    ],
+)
+def test_changelist_without_n_plus_one(
+        request, mixer, admin_client, url, objects):
+    request.getfixturevalue(objects)
+    _, before = changelist_queries(admin_client, url)
+    more_posts = mixer.cycle(3).blend(
+        "blog.Post", author=mixer.blend("auth.User"),
+        category=mixer.blend("blog.Category"),
+        location=mixer.blend("blog.Location"),
+    )
+    mixer.cycle(3).blend(
+        "blog.Comment", post=more_posts[0],
+        author=mixer.blend("auth.User"),
+    )
+    response, after = changelist_queries(admin_client, url)
+    assert after == before, (
+        f"Убедитесь, что число запросов страницы {url} не растёт "
+        "с числом объектов."
+    )
+    content = response.content.decode("utf-8")
+    assert "ж" * 101 not in content, (
+        f"Убедитесь, что на странице {url} выводится только начало текста."
+    )
+
+
+@pytest.mark.django_db
+def test_changelist_skips_full_count(admin_client, many_posts):
+    with CaptureQueriesContext(connection) as queries:
+        admin_client.get("/admin/blog/post/")
+    assert not any(
+        "COUNT(" in query["sql"].upper() for query in queries
+    ), "Убедитесь, что список постов без фильтров не считает COUNT(*)."
+
+
+@pytest.mark.django_db
+def test_estimated_count_follows_deletes(many_posts):
+    many_posts[0].delete()
+    assert EstimatedCountPaginator(
+        Post.objects.order_by("pk"), 2
+    ).count == 4, (
+        "Убедитесь, что оценка числа постов уменьшается, когда удаляются "
+        "самые старые посты (например, при переносе в архив)."
+    )
+    for post in many_posts[2:4]:
+        post.delete()
+    paginator = EstimatedCountPaginator(Post.objects.order_by("pk"), 2)
+    assert paginator.count == 4
+    assert len(paginator.page(1)) == 2
+    with pytest.raises(EmptyPage):
+        paginator.page(2)
+    assert paginator.count == 2 and paginator.num_pages == 1, (
+        "Убедитесь, что страница за концом выборки уточняет число постов."
+    )
+    paginator = EstimatedCountPaginator(Post.objects.order_by("pk"), 3)
+    assert len(paginator.page(1)) == 2 and paginator.num_pages == 1
+
+
+@pytest.mark.django_db
+def test_post_form_uses_autocomplete(admin_client):
+    content = admin_client.get("/admin/blog/post/add/").content.decode(
+        "utf-8"
+    )
+    for field in ("author", "location", "category"):
+        assert f'data-field-name="{field}"' in content, (
+            f"Убедитесь, что поле {field} выбирается через автодополнение."
+        )
@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.caching import anonymous_page_timeout, scope_versions
+
+
+@pytest.mark.django_db
+def test_feed_cached_for_anonymous(client, public_post):
+    client.get("/")
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+    assert response.status_code == 200
+    assert len(queries) == 0, (
+        "Убедитесь, что лента для анонимов отдаётся из кеша без запросов."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_feed_cache_reset_on_post_change(client, public_post):
+    client.get("/")
+    client.get(f"/category/{public_post.category.slug}/")
+    public_post.title = "Изменённый заголовок"
+    public_post.save()
+    for url in ("/", f"/category/{public_post.category.slug}/",
+                f"/profile/{public_post.author.username}/"):
+        assert "Изменённый заголовок" in client.get(url).content.decode(
+            "utf-8"
+        ), f"Убедитесь, что кеш страницы {url} сбрасывается при правке поста."
+
+
+@pytest.mark.django_db
+def test_feed_cache_expires_on_scheduled_post(mixer, public_post):
+    mixer.blend(
+        "blog.Post", author=public_post.author,
+        category=public_post.category, is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert anonymous_page_timeout() <= 31, (
+        "Убедитесь, что кеш ленты истекает к публикации отложенного поста."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_feed_cache_reset_after_commit(public_post):
+    initial = scope_versions("index")
+    with transaction.atomic():
+        public_post.title = "Изменённый заголовок"
+        public_post.save()
+        assert scope_versions("index") == initial, (
+            "Убедитесь, что кеш страниц сбрасывается только после фиксации "
+            "транзакции, а не до неё."
+        )
+    assert scope_versions("index") != initial, (
+        "Убедитесь, что после фиксации транзакции кеш страниц сбрасывается."
+    )
+
+
+def test_cache_reset_seen_by_other_processes(settings):
+    initial = scope_versions("index")
+    subprocess.run(
+        [sys.executable, "-c", (
+            "import django; django.setup(); "
+            "from blog.caching import invalidate_anonymous_pages; "
+            "invalidate_anonymous_pages('index')"
+        )],
+        check=True,
+        cwd=settings.BASE_DIR,
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": "blogicum.settings"},
+    )
+    assert scope_versions("index") != initial, (
+        "Убедитесь, что кеш общий для всех процессов: сброс страниц "
+        "командой publish_scheduled должен видеть и веб-процесс."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_pages_reset_on_profile_edit(client, user_client, user, public_post):
+    profile_url = f"/profile/{user.username}/"
+    client.get("/")
+    client.get(profile_url)
+    user_client.post("/profile_edit/", {
+        "username": user.username,
+        "first_name": "Алиса",
+        "last_name": "Новикова",
+        "email": "alice@example.com",
+    })
+    assert "Алиса Новикова" in client.get(profile_url).content.decode(
+        "utf-8"
+    ), "Убедитесь, что кеш профиля сбрасывается при смене имени."
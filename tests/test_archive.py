@@ -0,0 +1,142 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Comment, Post
+from conftest import N_PER_PAGE
+
+
+@pytest.fixture
+def archive(settings, tmp_path):
+    connections.databases["archive"] = {
+        **connections.databases["default"],
+        "NAME": str(tmp_path / "archive.sqlite3"),
+        "TEST": {},
+    }
+    settings.ARCHIVE_DATABASE = "archive"
+    call_command("migrate", database="archive", verbosity=0)
+    yield "archive"
+    connections["archive"].close()
+    del connections.databases["archive"]
+    del connections["archive"]
+
+
+@pytest.fixture
+def feed(mixer, user, published_category):
+    """Свежие посты и на один больше страницы старых, от новых к старым."""
+    now = timezone.now()
+    recent = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+        pub_date=(now - timedelta(days=i + 1) for i in range(3)),
+    )
+    old = mixer.cycle(N_PER_PAGE + 1).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+        pub_date=(now - timedelta(days=1000 + i) for i in range(100)),
+    )
+    return recent, old
+
+
+@pytest.mark.django_db(transaction=True)
+def test_archive_moves_old_posts_with_comments(
+        mixer, client, user, feed, archive):
+    recent, old = feed
+    comment = mixer.blend(
+        "blog.Comment", post=old[0], author=user, text="Старый комментарий"
+    )
+    call_command("archive_posts", batch=4, verbosity=0)
+    assert set(Post.objects.values_list("pk", flat=True)) == {
+        post.pk for post in recent
+    }, "Убедитесь, что в основной базе остались только свежие посты."
+    assert Post.objects.using(archive).count() == len(old)
+    archived_comment = Comment.objects.using(archive).get(pk=comment.pk)
+    assert archived_comment.created_at == comment.created_at, (
+        "Убедитесь, что при переносе сохраняются даты комментариев."
+    )
+    assert not Comment.objects.filter(pk=comment.pk).exists()
+    response = client.get(f"/posts/{old[0].pk}/")
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что страница архивного поста открывается."
+    )
+    assert comment.text in response.content.decode("utf-8"), (
+        "Убедитесь, что комментарии архивного поста читаются из архива."
+    )
+    assert "комментарии закрыты" in response.content.decode("utf-8"), (
+        "Убедитесь, что архивный пост нельзя комментировать."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_archive_is_resumable(feed, archive):
+    recent, old = feed
+    call_command("archive_posts", batch=2, max_batches=1, verbosity=0)
+    assert Post.objects.using(archive).count() == 2
+    call_command("archive_posts", batch=2, verbosity=0)
+    assert Post.objects.using(archive).count() == len(old), (
+        "Убедитесь, что повторный запуск продолжает перенос."
+    )
+    assert Post.objects.count() == len(recent)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("keyset", [False, True])
+def test_feed_continues_into_archive(client, feed, archive, keyset):
+    recent, old = feed
+    call_command("archive_posts", verbosity=0)
+    seen = []
+    url = "/"
+    with override_settings(KEYSET_PAGINATION=keyset):
+        while url:
+            page = client.get(url).context["page_obj"]
+            seen.extend(post.id for post in page)
+            if not page.has_next():
+                break
+            url = (
+                f"/?after={page.next_cursor()}" if keyset
+                else f"/?page={page.next_page_number()}"
+            )
+    assert seen == [post.id for post in [*recent, *old]], (
+        "Убедитесь, что после свежих постов лента продолжается архивными."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_archive_refreshes_references(
+        feed, user, published_category, archive):
+    recent, old = feed
+    call_command("archive_posts", verbosity=0)
+    user.username = "renamed"
+    user.save()
+    published_category.is_published = False
+    published_category.save()
+    call_command("archive_posts", verbosity=0)
+    post = Post.objects.using(archive).select_related("author").get(
+        pk=old[0].pk
+    )
+    assert post.author.username == "renamed"
+    assert not post.is_visible, (
+        "Убедитесь, что снятие категории с публикации скрывает "
+        "и архивные посты."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_archive_keeps_no_credentials(feed, user, archive):
+    user.email = "author@example.com"
+    user.set_password("secret-password")
+    user.save()
+    call_command("archive_posts", verbosity=0)
+    archived = type(user).objects.using(archive).get(pk=user.pk)
+    assert archived.username == user.username
+    assert not archived.has_usable_password(), (
+        "Убедитесь, что хеш пароля не копируется в архив."
+    )
+    assert not archived.email and not archived.is_active, (
+        "Убедитесь, что в архив не попадают почта и права пользователя."
+    )
@@ -0,0 +1,66 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_comments(
+        mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что у нового поста счётчик комментариев равен нулю."
+    )
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    mixer.blend(Comment, post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при добавлении комментария счётчик увеличивается."
+    )
+    Comment.objects.filter(post=post).delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что при удалении комментариев счётчик уменьшается."
+    )
+
+
+@pytest.mark.django_db
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend(Comment, post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    call_command("recount_comments", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что команда recount_comments пересчитывает счётчики."
+    )
+
+
+@pytest.mark.django_db
+def test_post_edit_keeps_new_comments(
+        mixer, user_client, post_with_published_location):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    mixer.blend(Comment, post=post)
+    post.title = "Новый заголовок"
+    post.save()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что правка поста не затирает счётчик комментариев, "
+        "добавленных после загрузки поста."
+    )
+
+
+@pytest.mark.django_db
+def test_recount_comments_skips_correct_counts(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.blend(Comment, post=post)
+    post.refresh_from_db()
+    call_command("recount_comments", stdout=StringIO())
+    assert Post.objects.get(pk=post.pk).updated_at == post.updated_at, (
+        "Убедитесь, что пересчёт не трогает посты с верным счётчиком: "
+        "иначе меняется updated_at и сбрасываются кеши."
+    )
@@ -0,0 +1,74 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.utils import timezone
+
+from blog.paginator import CommentKeysetPaginator
+
+
+@pytest.fixture
+def commented_post(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    mixer.cycle(settings.COMMENTS_ON_THE_PAGE + 5).blend(
+        "blog.Comment", post=post, author=user,
+    )
+    return post
+
+
+@pytest.mark.django_db
+def test_post_detail_shows_first_comments(client, commented_post):
+    response = client.get(f"/posts/{commented_post.id}/")
+    page = response.context["comments"]
+    assert len(page) == settings.COMMENTS_ON_THE_PAGE, (
+        "Убедитесь, что на странице поста выводится только первая порция "
+        "комментариев."
+    )
+    assert page.has_next()
+    assert f"/posts/{commented_post.id}/comments/?after=" in (
+        response.content.decode("utf-8")
+    )
+
+
+@pytest.mark.django_db
+def test_comments_fragment_returns_next_batch(client, commented_post):
+    first_page = client.get(f"/posts/{commented_post.id}/").context[
+        "comments"
+    ]
+    response = client.get(
+        f"/posts/{commented_post.id}/comments/"
+        f"?after={first_page.next_cursor()}"
+    )
+    assert response.status_code == HTTPStatus.OK
+    comments = list(response.context["comments"])
+    assert len(comments) == 5
+    assert comments[0].created_at >= first_page[-1].created_at
+    assert "<html" not in response.content.decode("utf-8"), (
+        "Убедитесь, что следующая порция комментариев отдаётся фрагментом "
+        "HTML без базового шаблона."
+    )
+
+
+@pytest.mark.django_db
+def test_comments_fragment_hidden_post(client, mixer, user):
+    post = mixer.blend("blog.Post", author=user, is_published=False)
+    response = client.get(f"/posts/{post.id}/comments/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_comment_page_uses_index_order(commented_post):
+    paginator = CommentKeysetPaginator(
+        commented_post.comments.all(), settings.COMMENTS_ON_THE_PAGE
+    )
+    cursor = paginator.encode_cursor(commented_post.comments.first())
+    plan = paginator.seek(paginator.queryset, cursor)[:21].explain()
+    assert "TEMP B-TREE" not in plan, (
+        "Убедитесь, что страница комментариев читается по индексу "
+        "(post, created_at, id) без сортировки."
+    )
+    assert "comment_post_page_idx" in plan
@@ -0,0 +1,151 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.checks import check_shared_caches
+from blog.models import Post
+
+
+def page_urls(post):
+    return (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    )
+
+
+@pytest.mark.django_db
+def test_not_modified_without_queries(client, public_post):
+    for url in page_urls(public_post):
+        response = client.get(url)
+        assert response.has_header("ETag") and response.has_header(
+            "Last-Modified"
+        ), f"Убедитесь, что страница {url} отдаёт ETag и Last-Modified."
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(
+                url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        assert response.status_code == 304, (
+            f"Убедитесь, что страница {url} отвечает 304 на If-None-Match "
+            "с актуальным ETag."
+        )
+        assert len(queries) == 0, (
+            f"Убедитесь, что ответ 304 для {url} не обращается к базе."
+        )
+
+
+@pytest.mark.django_db
+def test_if_modified_since(client, public_post):
+    response = client.get("/")
+    response = client.get(
+        "/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert response.status_code == 304, (
+        "Убедитесь, что лента отвечает 304 на If-Modified-Since."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_validators_change_with_content(
+        mixer, client, user_client, public_post):
+    urls = page_urls(public_post)
+    etags = {url: client.get(url)["ETag"] for url in urls}
+    mixer.blend("blog.Comment", post=public_post, author=public_post.author)
+    for url in urls:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, (
+            f"Убедитесь, что ETag страницы {url} меняется "
+            "при добавлении комментария."
+        )
+    assert user_client.get("/")["ETag"] != client.get("/")["ETag"], (
+        "Убедитесь, что ETag зависит от пользователя."
+    )
+
+
+@pytest.mark.django_db
+def test_validators_change_on_scheduled_post(mixer, client, public_post):
+    now = timezone.now()
+    mixer.blend(
+        "blog.Post", author=public_post.author,
+        category=public_post.category, is_published=True,
+        pub_date=now + timedelta(seconds=30),
+    )
+    etag = client.get("/")["ETag"]
+    with mock.patch(
+        "blog.caching.timezone.now", return_value=now + timedelta(minutes=1)
+    ):
+        response = client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag ленты меняется с публикацией отложенного поста."
+    )
+
+
+def test_process_local_cache_rejected(settings):
+    settings.CACHES = {
+        **settings.CACHES,
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
+    errors = check_shared_caches(None)
+    assert [error.id for error in errors] == ["blog.E001"], (
+        "Убедитесь, что проверка запрещает кеш в памяти процесса: "
+        "фоновые команды не смогут сбросить ETag веб-процессов."
+    )
+    settings.CACHES["default"] = settings.CACHES["post_cards"]
+    assert check_shared_caches(None) == []
+
+
+@pytest.mark.django_db
+def test_recount_comments_changes_validators(client, public_post):
+    Post.objects.filter(pk=public_post.pk).update(comment_count=5)
+    etag = client.get("/")["ETag"]
+    call_command("recount_comments", stdout=StringIO())
+    response = client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что пересчёт комментариев меняет ETag лент."
+    )
+
+
+@pytest.mark.django_db
+def test_validators_change_on_relogin(client, user, public_post):
+    url = f"/posts/{public_post.id}/"
+    client.force_login(user)
+    response = client.get(url)
+    assert "no-cache" in response["Cache-Control"] and (
+        "private" in response["Cache-Control"]
+    ), "Убедитесь, что браузер проверяет страницу при каждом показе."
+    assert not response.has_header("Last-Modified"), (
+        "Убедитесь, что авторизованный пользователь не получает "
+        "Last-Modified: он не учитывает смену сессии."
+    )
+    client.logout()
+    client.force_login(user)
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 200, (
+        "Убедитесь, что после повторного входа страница с формами "
+        "не отдаётся из кеша браузера со старым CSRF-токеном."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_validators_change_on_profile_edit(client, user_client, user):
+    url = f"/profile/{user.username}/"
+    etag = client.get(url)["ETag"]
+    user_client.post("/profile_edit/", {
+        "username": user.username,
+        "first_name": "Алиса",
+        "last_name": "Новикова",
+        "email": "alice@example.com",
+    })
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag профиля меняется при правке профиля."
+    )
@@ -0,0 +1,39 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    return sum("COUNT(" in query["sql"] for query in queries)
+
+
+@pytest.mark.django_db
+def test_feed_count_is_cached(mixer, client, user, published_category):
+    mixer.cycle(N_PER_PAGE + 1).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+    assert count_queries(client, "/") == 1
+    assert count_queries(client, "/?page=2") == 0, (
+        "Убедитесь, что число постов в ленте берётся из кеша."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_feed_count_reset_on_unpublish(
+        mixer, client, user, published_category):
+    posts = mixer.cycle(N_PER_PAGE + 1).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+    client.get("/")
+    posts[0].is_published = False
+    posts[0].save()
+    assert count_queries(client, "/") == 1, (
+        "Убедитесь, что кеш числа постов сбрасывается при снятии поста "
+        "с публикации."
+    )
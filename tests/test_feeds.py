@@ -0,0 +1,92 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import feeds
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def feed_urls(post):
+    return (
+        "/rss/",
+        "/atom/",
+        f"/category/{post.category.slug}/rss/",
+        f"/category/{post.category.slug}/atom/",
+        f"/profile/{post.author.username}/rss/",
+        f"/profile/{post.author.username}/atom/",
+    )
+
+
+@pytest.mark.django_db
+def test_feeds_show_visible_posts(mixer, client, feed_posts):
+    post = feed_posts[0]
+    hidden = mixer.blend(
+        "blog.Post", author=post.author, category=post.category,
+        is_published=True, pub_date=timezone.now() + timedelta(days=1),
+    )
+    for url in feed_urls(post):
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f"Убедитесь, что лента {url} доступна."
+        )
+        content = response.content.decode("utf-8")
+        assert post.title in content, (
+            f"Убедитесь, что в ленте {url} выводятся опубликованные посты."
+        )
+        assert hidden.title not in content, (
+            f"Убедитесь, что в ленте {url} нет отложенных постов."
+        )
+    assert "application/atom+xml" in client.get("/atom/")["Content-Type"]
+
+
+@pytest.mark.django_db
+def test_unpublished_category_feed_not_found(client, mixer):
+    category = mixer.blend("blog.Category", is_published=False)
+    response = client.get(f"/category/{category.slug}/rss/")
+    assert response.status_code == 404, (
+        "Убедитесь, что лента снятой с публикации категории недоступна."
+    )
+
+
+@pytest.mark.django_db
+def test_feed_polling_is_cached(client, feed_posts):
+    for url in feed_urls(feed_posts[0]):
+        etag = client.get(url)["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+            not_modified = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and len(queries) == 0, (
+            f"Убедитесь, что лента {url} отдаётся из кеша без запросов."
+        )
+        assert not_modified.status_code == 304, (
+            f"Убедитесь, что лента {url} отвечает 304 на If-None-Match."
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_feed_rebuilt_incrementally(client, feed_posts):
+    client.get("/rss/")
+    post = feed_posts[1]
+    post.title = "Изменённый заголовок"
+    post.save()
+    with mock.patch.object(
+        feeds, "build_feed_entry", wraps=feeds.build_feed_entry
+    ) as build:
+        content = client.get("/rss/").content.decode("utf-8")
+    assert "Изменённый заголовок" in content, (
+        "Убедитесь, что лента обновляется при правке поста."
+    )
+    assert build.call_count == 1, (
+        "Убедитесь, что при правке поста пересобирается только его запись."
+    )
@@ -0,0 +1,52 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+
+@pytest.fixture
+def many_public_posts(mixer, user, published_category):
+    now = timezone.now()
+    return mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(now - timedelta(minutes=i) for i in range(100)),
+    )
+
+
+@pytest.mark.django_db
+@override_settings(KEYSET_PAGINATION=True)
+def test_keyset_pagination_walks_feed(client, many_public_posts):
+    seen = []
+    url = "/"
+    while True:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        page = response.context["page_obj"]
+        seen.extend(post.id for post in page)
+        if not page.has_next():
+            break
+        url = f"/?after={page.next_cursor()}"
+    expected = [post.id for post in many_public_posts]
+    assert seen == expected, (
+        "Убедитесь, что курсорная пагинация выводит все посты по порядку "
+        "и без повторов."
+    )
+    previous = page.previous_cursor()
+    response = client.get(f"/?before={previous}")
+    assert [post.id for post in response.context["page_obj"]] == (
+        expected[N_PER_PAGE:N_PER_PAGE * 2]
+    )
+
+
+@pytest.mark.django_db
+@override_settings(KEYSET_PAGINATION=True)
+def test_keyset_pagination_bad_cursor(client, many_public_posts):
+    response = client.get("/?after=broken")
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,49 @@
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+
+from blog.caching import post_card_cache_keys
+from blog.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_card_cached_and_reset(client, post_with_published_location):
+    post = post_with_published_location
+    post.pub_date = post.pub_date.replace(year=2000)
+    post.save()
+    card_cache = caches[settings.POST_CARD_CACHE_ALIAS]
+    keys = post_card_cache_keys(post.id, post.comment_count, post.updated_at)
+    client.get("/")
+    assert card_cache.get_many(keys), (
+        "Убедитесь, что карточка поста кешируется при выводе ленты."
+    )
+    location = post.location
+    location.name = "Новое место"
+    location.save()
+    assert not card_cache.get_many(keys), (
+        "Убедитесь, что кеш карточки сбрасывается при изменении локации."
+    )
+    assert "Новое место" in client.get("/").content.decode("utf-8")
+
+
+@pytest.mark.django_db
+def test_post_card_reset_by_queryset_update(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get("/")
+    Post.objects.filter(pk=post.pk).update(title="Заголовок без сигналов")
+    assert "Заголовок без сигналов" in user_client.get("/").content.decode(
+        "utf-8"
+    ), (
+        "Убедитесь, что карточка обновляется и после QuerySet.update()."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_post_card_reset_on_author_rename(client, user, public_post):
+    client.get("/")
+    user.username = "renamed"
+    user.save()
+    assert "@renamed" in client.get("/").content.decode(
+        "utf-8"
+    ), "Убедитесь, что карточки постов сбрасываются при смене логина автора."
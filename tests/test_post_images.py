@@ -0,0 +1,211 @@
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.core.files.images import ImageFile
+from PIL import Image
+
+from blog.images import image_srcsets, variant_name
+from blog.models import Job
+from blog.tasks import requeue_stale_jobs, run_pending_jobs
+
+
+@pytest.fixture
+def post_with_big_image(mixer, user, published_category):
+    img_io = BytesIO()
+    Image.new("RGB", (2000, 1000), color=(73, 109, 137)).save(
+        img_io, format="JPEG"
+    )
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=ImageFile(img_io, name="big_image.jpg"),
+    )
+    run_pending_jobs()
+    return post
+
+
+@pytest.mark.django_db
+def test_image_variants_created(post_with_big_image):
+    image = post_with_big_image.image
+    for variant, width in settings.POST_IMAGE_VARIANTS.items():
+        for extension in ("webp", "jpg"):
+            name = variant_name(image.name, variant, extension)
+            assert image.storage.exists(name), (
+                f"Убедитесь, что для изображения создаётся копия {name}."
+            )
+            with image.storage.open(name) as variant_file:
+                assert Image.open(variant_file).width == width
+
+
+@pytest.mark.django_db
+def test_image_variants_in_srcset(user_client, post_with_big_image):
+    content = user_client.get(
+        f"/posts/{post_with_big_image.id}/"
+    ).content.decode("utf-8")
+    assert 'type="image/webp"' in content and "srcset=" in content, (
+        "Убедитесь, что изображение поста выводится с srcset."
+    )
+
+
+@pytest.mark.django_db
+def test_srcset_rendered_without_file_access(post_with_big_image):
+    image = post_with_big_image.image
+    expected = image_srcsets(image)
+    with mock.patch.object(
+        type(image.storage), "exists", side_effect=AssertionError
+    ), mock.patch.object(
+        type(image.storage), "open", side_effect=AssertionError
+    ):
+        assert image_srcsets(image) == expected, (
+            "Убедитесь, что srcset строится по ширинам, записанным при "
+            "создании копий, без обращения к файлам."
+        )
+    cache.clear()
+    assert image_srcsets(image) == expected, (
+        "Убедитесь, что без записи в кеше ширины определяются по файлам."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_image_variants_deleted_with_post(post_with_big_image):
+    image = post_with_big_image.image
+    name = variant_name(image.name, next(iter(settings.POST_IMAGE_VARIANTS)),
+                        "webp")
+    post_with_big_image.delete()
+    assert not image.storage.exists(name)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_image_kept_when_delete_rolls_back(post_with_big_image):
+    image = post_with_big_image.image
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            post_with_big_image.delete()
+            raise RuntimeError
+    assert image.storage.exists(image.name), (
+        "Убедитесь, что изображение удаляется только после фиксации "
+        "удаления поста: при откате пост остаётся с файлом."
+    )
+
+
+@pytest.mark.django_db
+def test_image_variants_queued_not_inline(mixer, user):
+    img_io = BytesIO()
+    Image.new("RGB", (800, 600)).save(img_io, format="JPEG")
+    post = mixer.blend(
+        "blog.Post", author=user,
+        image=ImageFile(img_io, name="queued_image.jpg"),
+    )
+    job = Job.objects.get(name="generate_post_image_variants")
+    assert job.status == Job.PENDING, (
+        "Убедитесь, что копии изображения создаются фоновой задачей."
+    )
+    name = variant_name(post.image.name, "card", "webp")
+    assert not post.image.storage.exists(name)
+    assert run_pending_jobs() == 1
+    job.refresh_from_db()
+    assert job.status == Job.DONE
+    assert post.image.storage.exists(name)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_same_upload_stored_once(mixer, user):
+    def upload():
+        img_io = BytesIO()
+        Image.new("RGB", (50, 50), color=(1, 2, 3)).save(
+            img_io, format="PNG"
+        )
+        return ImageFile(img_io, name="same.png")
+
+    first = mixer.blend("blog.Post", author=user, image=upload())
+    second = mixer.blend("blog.Post", author=user, image=upload())
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые изображения хранятся одним файлом."
+    )
+    storage = first.image.storage
+    first.delete()
+    assert storage.exists(second.image.name), (
+        "Убедитесь, что файл не удаляется, пока на него ссылается другой пост."
+    )
+    second.delete()
+    assert not storage.exists(second.image.name)
+
+
+def make_post_with_image(mixer, user, image, name, **save_kwargs):
+    img_io = BytesIO()
+    image.save(img_io, format="JPEG", **save_kwargs)
+    post = mixer.blend(
+        "blog.Post", author=user, image=ImageFile(img_io, name=name),
+    )
+    run_pending_jobs()
+    return post
+
+
+@pytest.mark.django_db
+def test_image_variants_follow_exif_orientation(mixer, user):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # снято с поворотом на 90°
+    post = make_post_with_image(
+        mixer, user, Image.new("RGB", (2000, 1000)), "phone.jpg", exif=exif
+    )
+    name = variant_name(post.image.name, "card", "webp")
+    with post.image.storage.open(name) as variant_file:
+        variant = Image.open(variant_file)
+        assert variant.height > variant.width, (
+            "Убедитесь, что копии учитывают поворот из EXIF."
+        )
+
+
+@pytest.mark.django_db
+def test_srcset_uses_saved_width_of_narrow_image(mixer, user):
+    post = make_post_with_image(
+        mixer, user, Image.new("RGB", (500, 300)), "narrow.jpg"
+    )
+    srcset = image_srcsets(post.image)["webp"]
+    assert srcset.endswith(" 500w") and len(srcset.split(", ")) == 1, (
+        "Убедитесь, что в srcset указана настоящая ширина копии узкого "
+        "изображения."
+    )
+
+
+@pytest.mark.django_db
+def test_stale_running_job_requeued(mixer, user):
+    img_io = BytesIO()
+    Image.new("RGB", (800, 600), color=(200, 10, 10)).save(
+        img_io, format="JPEG"
+    )
+    post = mixer.blend(
+        "blog.Post", author=user,
+        image=ImageFile(img_io, name="stale_image.jpg"),
+    )
+    started_at = timezone.now() - timedelta(
+        seconds=settings.BACKGROUND_TASKS_TIMEOUT + 1
+    )
+    Job.objects.update(status=Job.RUNNING, started_at=started_at)
+    assert run_pending_jobs() == 1, (
+        "Убедитесь, что задачи, брошенные упавшим обработчиком, "
+        "возвращаются в очередь."
+    )
+    assert post.image.storage.exists(
+        variant_name(post.image.name, "card", "webp")
+    )
+    job = Job.objects.get()
+    assert job.status == Job.DONE and job.attempts == 2
+
+
+@pytest.mark.django_db
+def test_stale_job_fails_after_max_attempts(mixer, user):
+    job = Job.objects.create(
+        name="generate_post_image_variants",
+        status=Job.RUNNING,
+        attempts=settings.BACKGROUND_TASKS_MAX_ATTEMPTS - 1,
+        started_at=timezone.now() - timedelta(days=1),
+    )
+    assert requeue_stale_jobs() == 1
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
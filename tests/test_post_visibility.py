@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.caching import activate_scheduled_posts
+from blog.models import Category, Post
+from blog.query_function import get_general_queryset_posts
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+def is_visible(post):
+    post.refresh_from_db()
+    return post.is_visible
+
+
+@pytest.mark.django_db
+def test_visibility_computed_on_save(public_post, scheduled_post):
+    assert is_visible(public_post), (
+        "Убедитесь, что опубликованный пост помечается видимым."
+    )
+    assert not is_visible(scheduled_post), (
+        "Убедитесь, что отложенный пост не виден до времени публикации."
+    )
+    public_post.is_published = False
+    public_post.save()
+    assert not is_visible(public_post), (
+        "Убедитесь, что снятый с публикации пост перестаёт быть видимым."
+    )
+
+
+@pytest.mark.django_db
+def test_category_unpublish_fans_out(public_post):
+    category = public_post.category
+    category.is_published = False
+    category.save()
+    assert not is_visible(public_post), (
+        "Убедитесь, что снятие категории с публикации скрывает её посты."
+    )
+    Category.objects.filter(pk=category.pk).update(is_published=True)
+    assert is_visible(public_post), (
+        "Убедитесь, что массовая публикация категорий "
+        "пересчитывает видимость постов."
+    )
+
+
+@pytest.mark.django_db
+def test_queryset_update_keeps_visibility(public_post):
+    Post.objects.filter(pk=public_post.pk).update(
+        pub_date=timezone.now() + timedelta(days=1)
+    )
+    assert not is_visible(public_post), (
+        "Убедитесь, что массовое изменение даты публикации "
+        "пересчитывает видимость постов."
+    )
+
+
+@pytest.mark.django_db
+def test_category_delete_hides_posts(public_post):
+    public_post.category.delete()
+    assert not is_visible(public_post), (
+        "Убедитесь, что посты удалённой категории перестают быть видимыми."
+    )
+
+
+@pytest.mark.django_db
+def test_scheduled_post_activation(scheduled_post):
+    assert activate_scheduled_posts() == 0
+    assert activate_scheduled_posts(
+        timezone.now() + timedelta(hours=2)
+    ) == 1, "Убедитесь, что пост становится видимым в срок публикации."
+    assert is_visible(scheduled_post)
+
+
+def test_public_queryset_filters_single_column():
+    where = str(get_general_queryset_posts().query).split("WHERE", 1)[1]
+    assert "is_visible" in where and "blog_category" not in where, (
+        "Убедитесь, что публичные выборки фильтруют посты по is_visible "
+        "без условий на категорию."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("model", ["category", "post"])
+def test_bulk_visibility_change_resets_pages(client, public_post, model):
+    etag = client.get("/")["ETag"]
+    if model == "category":
+        Category.objects.filter(pk=public_post.category_id).update(
+            is_published=False
+        )
+    else:
+        Post.objects.filter(pk=public_post.pk).update(is_published=False)
+    response = client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что массовое изменение видимости меняет ETag ленты."
+    )
+    assert public_post.title not in response.content.decode("utf-8"), (
+        "Убедитесь, что массовое изменение видимости сбрасывает кеш лент."
+    )
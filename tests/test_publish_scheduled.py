@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+
+
+@pytest.fixture
+def due_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+@pytest.mark.django_db
+def test_publish_scheduled_resets_cached_pages(client, due_post):
+    urls = (
+        "/",
+        f"/category/{due_post.category.slug}/",
+        f"/profile/{due_post.author.username}/",
+        "/rss/",
+    )
+    for url in urls:
+        assert due_post.title not in client.get(url).content.decode("utf-8")
+    # Время публикации наступило, но страницы ещё в кеше
+    Post.objects.filter(pk=due_post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1), is_visible=False
+    )
+    call_command("publish_scheduled", once=True)
+    due_post.refresh_from_db()
+    assert due_post.is_visible, (
+        "Убедитесь, что команда publish_scheduled публикует посты, "
+        "время которых наступило."
+    )
+    for url in urls:
+        assert due_post.title in client.get(url).content.decode("utf-8"), (
+            f"Убедитесь, что после публикации отложенного поста "
+            f"сбрасывается кеш страницы {url}."
+        )
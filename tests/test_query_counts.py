@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+URLS = {
+    "index": lambda post: "/",
+    "category": lambda post: f"/category/{post.category.slug}/",
+    "profile": lambda post: f"/profile/{post.author.username}/",
+    "detail": lambda post: f"/posts/{post.id}/",
+}
+
+
+@pytest.fixture
+def feed(mixer, user, published_category, published_location):
+    posts = mixer.cycle(N_PER_PAGE + 2).blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    mixer.cycle(3).blend("blog.Comment", post=posts[0], author=user)
+    return posts
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("client_name", "page", "expected"),
+    [
+        ("client", "index", 3),
+        ("client", "category", 4),
+        ("client", "profile", 4),
+        ("client", "detail", 3),
+        ("user_client", "index", 5),
+        ("user_client", "category", 6),
+        ("user_client", "profile", 6),
+        ("user_client", "detail", 5),
+    ],
+)
+def test_query_count(request, feed, client_name, page, expected):
+    client = request.getfixturevalue(client_name)
+    url = URLS[page](feed[0])
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    sql = "\n".join(query["sql"] for query in queries)
+    assert len(queries) == expected, (
+        f"Страница {url} выполняет {len(queries)} SQL-запросов "
+        f"вместо {expected}:\n{sql}"
+    )
+
+
+@pytest.fixture
+def own_comment(mixer, user, feed):
+    return mixer.blend("blog.Comment", post=feed[0], author=user)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("url_pattern", "expected"),
+    [
+        ("/posts/{post}/edit/", 5),
+        ("/posts/{post}/delete/", 4),
+        ("/posts/{post}/edit_comment/{comment}/", 3),
+        ("/posts/{post}/delete_comment/{comment}/", 3),
+    ],
+)
+def test_author_pages_query_count(
+        user_client, own_comment, url_pattern, expected):
+    url = url_pattern.format(post=own_comment.post_id, comment=own_comment.id)
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(url)
+    assert response.status_code == 200
+    sql = "\n".join(query["sql"] for query in queries)
+    assert len(queries) == expected, (
+        f"Страница {url} выполняет {len(queries)} SQL-запросов "
+        f"вместо {expected}:\n{sql}"
+    )
@@ -0,0 +1,110 @@
+import time
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from blog.middleware import PRIMARY_COOKIE
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    connections.databases["replica"] = {
+        **connections.databases["default"],
+        "NAME": str(tmp_path / "replica.sqlite3"),
+        "TEST": {},
+    }
+    settings.DATABASE_REPLICAS = ["replica"]
+    yield "replica"
+    connections["replica"].close()
+    del connections.databases["replica"]
+    del connections["replica"]
+
+
+def content(client, url):
+    return client.get(url).content.decode("utf-8")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_feeds_read_from_replica(
+        make_post, user_client, replica):
+    make_post("Пост до копирования")
+    call_command("sync_replicas")
+    with CaptureQueriesContext(connections[replica]) as queries:
+        assert "Пост до копирования" in content(user_client, "/")
+    assert queries, "Убедитесь, что лента читается с реплики."
+    make_post("Пост после копирования")
+    with CaptureQueriesContext(connections[replica]) as queries:
+        page = content(user_client, "/")
+    assert "Пост после копирования" in page and not queries, (
+        "Убедитесь, что страница не читается с реплики, которая ещё "
+        "не получила изменения ленты: иначе старая страница попала бы "
+        "в кеш и получила ETag под новой версией."
+    )
+    call_command("sync_replicas")
+    with CaptureQueriesContext(connections[replica]) as queries:
+        assert "Пост после копирования" in content(user_client, "/")
+    assert queries, (
+        "Убедитесь, что команда sync_replicas обновляет реплику."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_author_reads_own_writes(
+        make_post, user_client, replica):
+    post = make_post("Пост")
+    call_command("sync_replicas")
+    url = f"/posts/{post.pk}/"
+    response = user_client.post(
+        f"{url}comment/", {"text": "Свежий комментарий"}
+    )
+    assert response.status_code == 302
+    assert PRIMARY_COOKIE in response.cookies, (
+        "Убедитесь, что после записи пользователь закрепляется "
+        "за основной базой."
+    )
+    assert "Свежий комментарий" in content(user_client, url), (
+        "Убедитесь, что автор сразу видит свой комментарий."
+    )
+    user_client.cookies.pop(PRIMARY_COOKIE)
+    assert "Свежий комментарий" in content(user_client, url), (
+        "Убедитесь, что страница поста не читается с реплики, "
+        "которая ещё не получила его изменения."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_pin_lasts_until_replica_passes_write(
+        make_post, user_client, replica):
+    post = make_post("Пост")
+    call_command("sync_replicas")
+    url = f"/posts/{post.pk}/"
+    user_client.post(f"{url}comment/", {"text": "Свежий комментарий"})
+    with mock.patch(
+        "blog.middleware.time.time", return_value=time.time() + 60
+    ):
+        # Пауза дольше прежних 10 секунд закрепления
+        assert "Свежий комментарий" in content(user_client, url), (
+            "Убедитесь, что закрепление за основной базой держится, "
+            "пока реплика не получит запись."
+        )
+    call_command("sync_replicas")
+    with CaptureQueriesContext(connections[replica]) as queries:
+        assert "Свежий комментарий" in content(user_client, url)
+    assert queries, (
+        "Убедитесь, что после копирования реплики пользователь снова "
+        "читает с неё."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_unsynced_replica_not_read(
+        make_post, client, replica):
+    make_post("Пост")
+    with CaptureQueriesContext(connections[replica]) as queries:
+        assert "Пост" in content(client, "/")
+    assert not queries, (
+        "Убедитесь, что реплика без отметки о копировании не читается."
+    )
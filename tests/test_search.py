@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+from blog.search import clear_index, search_posts
+
+
+def found_titles(client, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == 200
+    return [post.title for post in response.context["page_obj"]]
+
+
+@pytest.mark.django_db
+def test_search_uses_russian_stemming(client, make_post):
+    make_post("Про котов", "Коты любят спать на солнце.")
+    make_post("Про собак", "Собаки любят гулять.")
+    assert found_titles(client, "кот") == ["Про котов"], (
+        "Убедитесь, что поиск находит посты по другим формам слова."
+    )
+    assert found_titles(client, "солнцем любили") == ["Про котов"], (
+        "Убедитесь, что поиск требует совпадения всех слов запроса."
+    )
+
+
+@pytest.mark.django_db
+def test_search_ranks_title_higher(client, make_post):
+    make_post("Путешествие", "Рассказ о горах и море.")
+    make_post("Горы", "Путешествие в горы.")
+    assert found_titles(client, "горы") == ["Горы", "Путешествие"], (
+        "Убедитесь, что совпадение в заголовке ранжируется выше."
+    )
+
+
+@pytest.mark.django_db
+def test_search_respects_visibility(client, make_post, mixer):
+    make_post("Черновик про котов", "Коты дома", is_published=False)
+    make_post(
+        "Будущий пост про котов", "Коты на улице",
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    make_post(
+        "Пост в скрытой категории про котов", "Коты в саду",
+        category=mixer.blend("blog.Category", is_published=False),
+    )
+    assert found_titles(client, "коты") == [], (
+        "Убедитесь, что поиск выдаёт только опубликованные посты."
+    )
+
+
+@pytest.mark.django_db
+def test_search_index_follows_changes(make_post):
+    post = make_post("Про котов", "Коты")
+    post.title = "Про собак"
+    post.text = "Собаки"
+    post.save()
+    assert not search_posts(Post.objects.all(), "коты").exists(), (
+        "Убедитесь, что поисковый индекс обновляется при правке поста."
+    )
+    assert search_posts(Post.objects.all(), "собака").exists()
+    post.delete()
+    assert not search_posts(Post.objects.all(), "собака").exists(), (
+        "Убедитесь, что удалённый пост исчезает из поискового индекса."
+    )
+
+
+@pytest.mark.django_db
+def test_search_index_follows_bulk_changes(make_post, user):
+    post = make_post("Про котов", "Коты")
+    Post.objects.filter(pk=post.pk).update(text="Собаки")
+    assert search_posts(Post.objects.all(), "собака").exists(), (
+        "Убедитесь, что индекс обновляется при QuerySet.update()."
+    )
+    Post.objects.bulk_create([Post(
+        title="Про птиц", text="Птицы", author=user,
+        pub_date=timezone.now(),
+    )])
+    assert search_posts(Post.objects.all(), "птицы").exists(), (
+        "Убедитесь, что посты из bulk_create попадают в индекс."
+    )
+
+
+@pytest.mark.django_db
+def test_bulk_create_indexes_only_new_posts(make_post, user):
+    make_post("Про котов", "Коты")
+    clear_index()
+    Post.objects.bulk_create([
+        Post(title="Про птиц", text="Птицы", author=user,
+             pub_date=timezone.now()),
+        Post(pk=10_000, title="Про рыб", text="Рыбы", author=user,
+             pub_date=timezone.now()),
+    ])
+    posts = Post.objects.all()
+    assert search_posts(posts, "птицы").exists() and search_posts(
+        posts, "рыбы"
+    ).exists(), "Убедитесь, что посты из bulk_create попадают в индекс."
+    assert not search_posts(posts, "кот").exists(), (
+        "Убедитесь, что bulk_create ищет пропущенные в индексе посты "
+        "только среди новых, а не по всей таблице."
+    )
+
+
+@pytest.mark.django_db
+def test_reindex_command(make_post):
+    make_post("Про котов", "Коты")
+    clear_index()
+    call_command("reindex_search", batch=1)
+    assert search_posts(Post.objects.all(), "кот").exists(), (
+        "Убедитесь, что команда reindex_search перестраивает индекс."
+    )
+
+
+@pytest.mark.django_db
+def test_admin_search(admin_client, make_post):
+    make_post("Про котов", "Коты любят спать.")
+    response = admin_client.get("/admin/blog/post/", {"q": "котами"})
+    assert response.status_code == 200
+    assert [post.title for post in response.context["cl"].result_list] == [
+        "Про котов"
+    ], "Убедитесь, что поиск в админке идёт по полнотекстовому индексу."
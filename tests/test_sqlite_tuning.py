@@ -0,0 +1,77 @@
+from unittest import mock
+
+import pytest
+from django.db import OperationalError, connection
+
+from blog.mixin import SerializedWriteMixin
+from blog.models import Location
+from blog.transactions import serialized_write
+
+
+@pytest.mark.django_db
+def test_connection_pragmas(settings):
+    with connection.cursor() as cursor:
+        for name in ("busy_timeout", "cache_size"):
+            value = settings.SQLITE_PRAGMAS[name]
+            cursor.execute(f"PRAGMA {name}")
+            assert cursor.fetchone()[0] == value, (
+                f"Убедитесь, что соединение с базой получает PRAGMA {name} "
+                "из настройки SQLITE_PRAGMAS."
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_serialized_write_retries_when_locked(settings):
+    settings.SQLITE_WRITE_BACKOFF = 0
+    function = mock.Mock(side_effect=[
+        OperationalError("database is locked"),
+        OperationalError("database is locked"),
+        "готово",
+    ])
+    assert serialized_write(function)() == "готово"
+    assert function.call_count == 3, (
+        "Убедитесь, что запись повторяется, пока база занята."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_serialized_write_gives_up(settings):
+    settings.SQLITE_WRITE_BACKOFF = 0
+    settings.SQLITE_WRITE_RETRIES = 1
+    function = mock.Mock(side_effect=OperationalError("database is locked"))
+    with pytest.raises(OperationalError):
+        serialized_write(function)()
+    assert function.call_count == 2
+    other = mock.Mock(side_effect=OperationalError("no such table"))
+    with pytest.raises(OperationalError):
+        serialized_write(other)()
+    assert other.call_count == 1, (
+        "Убедитесь, что повторяются только ошибки блокировки базы."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_serialized_form_retry_starts_from_new_object(settings, mixer, user):
+    settings.SQLITE_WRITE_BACKOFF = 0
+    states = []
+
+    class SaveForm:
+        def form_valid(self, form):
+            states.append((form.instance.pk, form.instance._state.adding))
+            form.instance.save()
+            if len(states) == 1:
+                raise OperationalError("database is locked")
+            return form.instance
+
+    class View(SerializedWriteMixin, SaveForm):
+        pass
+
+    location = mixer.blend("blog.Location")
+    instance = View().form_valid(
+        mock.Mock(instance=Location(name="Новая локация"))
+    )
+    assert states == [(None, True), (None, True)], (
+        "Убедитесь, что повторная попытка сохранения начинается "
+        "с несохранённого объекта."
+    )
+    assert Location.objects.exclude(pk=location.pk).get() == instance
@@ -0,0 +1,90 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.test import RequestFactory, override_settings
+
+from blog.serving import serve
+
+HASHED_NAME = "css/site.0123456789ab.css"
+CONTENT = b"body { color: black; }\n" * 100
+
+
+@pytest.fixture
+def document_root(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / HASHED_NAME).write_bytes(CONTENT)
+    (tmp_path / f"{HASHED_NAME}.gz").write_bytes(gzip.compress(CONTENT))
+    (tmp_path / "plain.txt").write_bytes(b"0123456789")
+    return tmp_path
+
+
+def get(document_root, path, **headers):
+    request = RequestFactory().get(f"/static/{path}", **headers)
+    return serve(request, path, document_root=str(document_root))
+
+
+def test_hashed_file_is_immutable(document_root):
+    response = get(document_root, HASHED_NAME)
+    assert response.status_code == HTTPStatus.OK
+    assert "immutable" in response["Cache-Control"]
+    assert response["ETag"] and response["Last-Modified"]
+    assert "immutable" not in get(document_root, "plain.txt")[
+        "Cache-Control"
+    ]
+
+
+def test_precompressed_variant_served(document_root):
+    response = get(
+        document_root, HASHED_NAME, HTTP_ACCEPT_ENCODING="gzip, deflate"
+    )
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"].startswith("text/css")
+    body = b"".join(response.streaming_content)
+    assert gzip.decompress(body) == CONTENT
+
+
+def test_conditional_get(document_root):
+    response = get(document_root, HASHED_NAME)
+    assert get(
+        document_root, HASHED_NAME, HTTP_IF_NONE_MATCH=response["ETag"]
+    ).status_code == HTTPStatus.NOT_MODIFIED
+    assert get(
+        document_root, HASHED_NAME,
+        HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+    ).status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_range_request(document_root):
+    response = get(document_root, "plain.txt", HTTP_RANGE="bytes=2-5")
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert response["Content-Range"] == "bytes 2-5/10"
+    assert b"".join(response.streaming_content) == b"2345"
+    assert get(
+        document_root, "plain.txt", HTTP_RANGE="bytes=20-"
+    ).status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+
+
+def test_path_outside_root(document_root):
+    from django.http import Http404
+
+    with pytest.raises(Http404):
+        get(document_root, "../etc/passwd")
+
+
+def test_collectstatic_hashes_and_compresses(tmp_path):
+    with override_settings(
+        STATIC_ROOT=tmp_path,
+        STATICFILES_STORAGE=(
+            "blog.staticfiles.PrecompressedManifestStaticFilesStorage"
+        ),
+    ):
+        call_command("collectstatic", interactive=False, verbosity=0)
+    manifest = json.loads((tmp_path / "staticfiles.json").read_text())
+    hashed = manifest["paths"]["css/bootstrap.min.css"]
+    assert hashed != "css/bootstrap.min.css"
+    assert (tmp_path / f"{hashed}.gz").exists(), (
+        "Убедитесь, что collectstatic создаёт сжатые копии статики."
+    )
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+MODELS = (Category, Comment, Location, Post)
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_updated_at_indexed(model):
+    field = model._meta.get_field("updated_at")
+    assert field.auto_now and field.db_index, (
+        f"Убедитесь, что у модели {model.__name__} есть индексированное "
+        "поле `updated_at`, обновляемое при сохранении."
+    )
+
+
+@pytest.mark.django_db
+def test_updated_at_on_save(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(
+        updated_at=timezone.now() - timedelta(days=1)
+    )
+    post.refresh_from_db()
+    before = post.updated_at
+    post.title = "Новый заголовок"
+    post.save()
+    assert post.updated_at > before, (
+        "Убедитесь, что `updated_at` обновляется при сохранении поста."
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("model", MODELS)
+def test_updated_at_on_queryset_update(mixer, model):
+    obj = mixer.blend(model)
+    stale = timezone.now() - timedelta(days=1)
+    model.objects.filter(pk=obj.pk).update(updated_at=stale)
+    model.objects.filter(pk=obj.pk).update(is_published=False)
+    obj.refresh_from_db()
+    assert obj.updated_at > stale, (
+        f"Убедитесь, что `{model.__name__}.objects.update()` "
+        "обновляет `updated_at`."
+    )
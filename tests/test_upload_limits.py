@@ -0,0 +1,121 @@
+import struct
+import zlib
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, override_settings
+from PIL import Image
+
+from blog.models import Post
+
+
+def make_upload(size, noise=False):
+    image = Image.new("RGB", size, color=(10, 20, 30))
+    if noise:
+        image = Image.effect_noise(size, 100).convert("RGB")
+    img_io = BytesIO()
+    image.save(img_io, format="PNG")
+    return SimpleUploadedFile(
+        "upload.png", img_io.getvalue(), content_type="image/png"
+    )
+
+
+@pytest.fixture
+def post_form_data(published_category, published_location):
+    return {
+        "title": "Заголовок",
+        "text": "Текст с изображением",
+        "pub_date": "2020-01-01T10:00",
+        "category": published_category.id,
+        "location": published_location.id,
+    }
+
+
+@pytest.mark.django_db
+@override_settings(POST_IMAGE_MAX_PIXELS=100 * 100)
+def test_too_many_pixels_rejected(user_client, post_form_data):
+    response = user_client.post(
+        "/posts/create/",
+        data={**post_form_data, "image": make_upload((200, 200))},
+    )
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что изображение с превышением числа пикселей "
+        "отклоняется с ошибкой в форме."
+    )
+    assert not Post.objects.exists()
+
+
+def png_header(width, height):
+    """Начало PNG, в заголовке которого записаны огромные размеры."""
+    def chunk(kind, data):
+        return (
+            struct.pack(">I", len(data)) + kind + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+    return b"\x89PNG\r\n\x1a\n" + chunk(
+        b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    ) + chunk(b"IDAT", zlib.compress(b"\x00" * 100))
+
+
+@pytest.mark.django_db
+def test_decompression_bomb_header_rejected(user_client, post_form_data):
+    upload = SimpleUploadedFile(
+        "bomb.png", png_header(20000, 20000), content_type="image/png"
+    )
+    response = user_client.post(
+        "/posts/create/", data={**post_form_data, "image": upload}
+    )
+    assert response.status_code == 200, (
+        "Убедитесь, что изображение, которое Pillow считает "
+        "декомпрессионной бомбой, не приводит к ошибке сервера."
+    )
+    assert "image" in response.context["form"].errors
+    assert not Post.objects.exists()
+
+
+@pytest.mark.django_db
+@override_settings(POST_IMAGE_MAX_BYTES=10 * 1024)
+def test_too_many_bytes_rejected(user_client, post_form_data):
+    response = user_client.post(
+        "/posts/create/",
+        data={**post_form_data, "image": make_upload((300, 300), True)},
+    )
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что слишком большой файл отклоняется с ошибкой в форме."
+    )
+    assert not Post.objects.exists()
+
+
+@pytest.mark.django_db
+def test_image_within_limits_accepted(user_client, post_form_data):
+    response = user_client.post(
+        "/posts/create/",
+        data={**post_form_data, "image": make_upload((200, 200))},
+    )
+    assert response.status_code == 302
+    assert Post.objects.get().image
+
+
+@pytest.mark.django_db
+def test_post_form_keeps_csrf_check(user, post_form_data):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    response = client.post(
+        "/posts/create/",
+        data={**post_form_data, "image": make_upload((200, 200))},
+    )
+    assert response.status_code == 403, (
+        "Убедитесь, что форма поста по-прежнему проверяет CSRF-токен."
+    )
+    assert not Post.objects.exists()
+
+
+def test_limits_not_installed_globally(settings):
+    assert "blog.uploads.LimitedImageUploadHandler" not in (
+        settings.FILE_UPLOAD_HANDLERS
+    ), (
+        "Убедитесь, что ограничения изображений постов не действуют "
+        "на все загрузки сайта."
+    )